@@ -1,12 +1,120 @@
-from django.contrib import admin
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.urls import path
+from django.utils import timezone
 
-from .models import Category, Comment, Location, Post
+from .caching import bump_versions, forget_next_publication
+from .dumps import EXPORT_FORMATS, iter_export
+from .models import Category, Comment, ImageJob, Location, Post
+from .paginators import CappedCountPaginator
+from .search import search_posts
 
 admin.site.empty_value_display = 'Не задано'
 
+EXPORT_CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class FastChangeListMixin:
+    """Списки в админке без полного COUNT по таблице."""
+
+    paginator = CappedCountPaginator
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        # Ссылка «Показать все» появляется, только если число строк
+        # точное и не больше list_max_show_all.
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            cap=max(settings.BLOG_ADMIN_COUNT_CAP, self.list_max_show_all)
+        )
+
+
+class ExportMixin:
+    """Потоковая выгрузка всей таблицы из списка объектов.
+
+    Файл отдаётся `StreamingHttpResponse` по мере чтения строк из БД;
+    параметр `after_id` продолжает прерванную выгрузку.
+    """
+
+    change_list_template = 'admin/blog/export_change_list.html'
+    export_table = None
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                'export/',
+                self.admin_site.admin_view(self.export_view),
+                name=f'{opts.app_label}_{opts.model_name}_export'
+            ),
+        ] + super().get_urls()
+
+    def export_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        export_format = request.GET.get('format', 'jsonl')
+        try:
+            after_id = int(request.GET.get('after_id', 0))
+        except ValueError:
+            return HttpResponseBadRequest('after_id должен быть числом.')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest('Неизвестный формат выгрузки.')
+        response = StreamingHttpResponse(
+            iter_export(self.export_table, export_format, after_id),
+            content_type=EXPORT_CONTENT_TYPES[export_format]
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.export_table}.{export_format}"'
+        )
+        return response
+
+
+class PublishActionsMixin:
+    """Публикация и снятие с публикации выбранных объектов одним UPDATE.
+
+    `QuerySet.update` не отправляет сигналы, поэтому кэш сбрасывается
+    разом для пространств имён из `invalidated_namespaces`.
+    """
+
+    actions = ('publish', 'unpublish')
+    invalidated_namespaces = ()
+
+    def update_published(self, request, queryset, is_published):
+        updated = queryset.update(is_published=is_published)
+        bump_versions(self.invalidated_namespaces)
+        return updated
+
+    @admin.action(description='Опубликовать выбранные')
+    def publish(self, request, queryset):
+        updated = self.update_published(request, queryset, True)
+        self.message_user(request, f'Опубликовано объектов: {updated}.')
+
+    @admin.action(description='Снять с публикации выбранные')
+    def unpublish(self, request, queryset):
+        updated = self.update_published(request, queryset, False)
+        self.message_user(request, f'Снято с публикации объектов: {updated}.')
+
+
+class PostActionForm(ActionForm):
+    category = forms.ModelChoiceField(
+        Category.objects.all(),
+        required=False,
+        label='Категория'
+    )
+
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(
+    PublishActionsMixin, FastChangeListMixin, admin.ModelAdmin
+):
     list_display = (
         'title',
         'is_published',
@@ -15,12 +123,15 @@ class CategoryAdmin(admin.ModelAdmin):
         'is_published',
     )
     search_fields = ('title',)
-    list_filter = ('title',)
+    list_filter = ('is_published',)
     list_display_links = ('title',)
+    invalidated_namespaces = ('posts', 'categories')
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(
+    PublishActionsMixin, FastChangeListMixin, admin.ModelAdmin
+):
     list_display = (
         'name',
         'is_published',
@@ -29,35 +140,107 @@ class LocationAdmin(admin.ModelAdmin):
         'is_published',
     )
     search_fields = ('name',)
-    list_filter = ('name',)
+    list_filter = ('is_published',)
     list_display_links = ('name',)
+    invalidated_namespaces = ('locations',)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(
+    ExportMixin, PublishActionsMixin, FastChangeListMixin, admin.ModelAdmin
+):
     list_display = (
         'title',
         'is_published',
         'category',
-        'author'
+        'author',
+        'pub_date'
     )
     list_editable = (
         'is_published',
-        'category'
     )
-    search_fields = ('title',)
-    list_filter = ('category',)
+    list_select_related = ('category', 'author')
+    autocomplete_fields = ('author', 'category', 'location')
+    # Поиск идёт по индексу FTS из get_search_results(); поля здесь
+    # включают строку поиска и описывают, что в индексе.
+    search_fields = ('title', 'text')
+    list_filter = ('is_published', 'category')
     list_display_links = ('title',)
+    action_form = PostActionForm
+    export_table = 'posts'
+    actions = PublishActionsMixin.actions + ('move_to_category',)
+
+    def update_posts(self, queryset, **fields):
+        """Обновляет посты одним UPDATE и сбрасывает их кэш.
+
+        Вместе с полями меняется `updated_at`, от которого зависят ключи
+        кэша карточек в ленте.
+        """
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = Post.objects.filter(pk__in=pks).update(
+            updated_at=timezone.now(), **fields
+        )
+        bump_versions(['posts', *(f'post:{pk}' for pk in pks)])
+        forget_next_publication()
+        return updated
+
+    def update_published(self, request, queryset, is_published):
+        return self.update_posts(queryset, is_published=is_published)
+
+    @admin.action(description='Перенести выбранные в категорию')
+    def move_to_category(self, request, queryset):
+        try:
+            category = PostActionForm.base_fields['category'].clean(
+                request.POST.get('category')
+            )
+        except ValidationError:
+            category = None
+        if category is None:
+            self.message_user(
+                request, 'Выберите категорию.', level=messages.ERROR
+            )
+            return
+        updated = self.update_posts(queryset, category=category)
+        self.message_user(
+            request, f'Перенесено постов в «{category}»: {updated}.'
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'image' in form.changed_data:
+            obj.schedule_image_variants()
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ExportMixin, FastChangeListMixin, admin.ModelAdmin):
     list_display = (
         'text',
-        'author'
-    )
-    list_editable = (
         'author',
+        'post',
+        'created_at'
     )
+    list_select_related = ('author', 'post')
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    export_table = 'comments'
     search_fields = ('text',)
     list_display_links = ('text',)
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(FastChangeListMixin, admin.ModelAdmin):
+    list_display = (
+        'image',
+        'status',
+        'attempts',
+        'created_at'
+    )
+    list_filter = ('status',)
+    list_select_related = ('post',)
+    raw_id_fields = ('post',)
+    readonly_fields = ('started_at',)
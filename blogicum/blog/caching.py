@@ -0,0 +1,118 @@
+import random
+
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Post
+
+VERSION_KEY = 'blog:version:{}'
+NEXT_PUBLICATION_KEY = 'blog:next_publication'
+LAST_RELEASE_KEY = 'blog:last_release'
+NO_SCHEDULED_POSTS = 'none'
+
+
+def initial_version():
+    """Начальная версия пространства имён — случайное число.
+
+    После очистки кэша версии не начинаются заново с единицы, поэтому
+    справочники в памяти процессов не примут старые данные за свежие.
+    """
+    return random.randrange(1, 2 ** 31)
+
+
+def get_version(namespace):
+    """Текущая версия данных пространства имён, например `posts`.
+
+    Версия входит в ключи кэша, поэтому её увеличение разом делает
+    недействительными все ключи пространства без перебора.
+    """
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    key = VERSION_KEY.format(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = initial_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def bump_versions(namespaces):
+    """Увеличивает версии многих пространств имён за два обращения к кэшу.
+
+    В отличие от `bump_version` увеличение не атомарно: при гонке версия
+    может вырасти на единицу меньше, но всё равно станет новой.
+    """
+    keys = [VERSION_KEY.format(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    cache.set_many({
+        key: versions[key] + 1 if key in versions else initial_version()
+        for key in keys
+    }, timeout=None)
+
+
+def next_publication():
+    """Дата выхода ближайшего отложенного поста или None.
+
+    Значение хранится в кэше, пока не наступит эта дата или не изменится
+    какой-нибудь пост, так что лента не ищет его запросом к БД.
+    """
+    now = timezone.now()
+    next_pub_date = cache.get(NEXT_PUBLICATION_KEY)
+    if next_pub_date is None or (
+        next_pub_date != NO_SCHEDULED_POSTS and next_pub_date <= now
+    ):
+        next_pub_date = Post.objects.filter(
+            is_published=True, pub_date__gt=now
+        ).aggregate(next=Min('pub_date'))['next'] or NO_SCHEDULED_POSTS
+        cache.set(NEXT_PUBLICATION_KEY, next_pub_date, timeout=None)
+    if next_pub_date == NO_SCHEDULED_POSTS:
+        return None
+    return next_pub_date
+
+
+def seconds_until_next_publication():
+    next_pub_date = next_publication()
+    if next_pub_date is None:
+        return None
+    seconds = (next_pub_date - timezone.now()).total_seconds()
+    return max(int(seconds) + 1, 1)
+
+
+def cap_timeout(timeout):
+    """Ограничивает время жизни кэша ленты выходом следующего поста."""
+    until_next = seconds_until_next_publication()
+    if until_next is None:
+        return timeout
+    return min(timeout, until_next)
+
+
+def forget_next_publication():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def release_scheduled_posts(now=None):
+    """Сбрасывает кэш лент, если с прошлого вызова вышли отложенные посты.
+
+    Возвращает число вышедших постов. При первом вызове, когда время
+    прошлого запуска неизвестно, кэш лент сбрасывается на всякий случай.
+    """
+    now = now or timezone.now()
+    released_until = cache.get(LAST_RELEASE_KEY)
+    cache.set(LAST_RELEASE_KEY, now, timeout=None)
+    released = Post.objects.filter(is_published=True, pub_date__lte=now)
+    if released_until is not None:
+        released = released.filter(pub_date__gt=released_until)
+    count = released.count()
+    if count or released_until is None:
+        bump_version('posts')
+        forget_next_publication()
+    return count
@@ -0,0 +1,151 @@
+import bz2
+import csv
+import gzip
+import json
+import lzma
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from .models import Comment, Post
+
+OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+CHUNK_SIZE = 1024 * 1024
+WHITESPACE = ' \t\n\r'
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('jsonl', 'csv')
+
+
+def open_dump(path, mode='rt'):
+    """Открывает дамп, сжатый или нет, по расширению файла."""
+    for extension, opener in OPENERS.items():
+        if str(path).endswith(extension):
+            return opener(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class JSONArrayReader:
+    """Элементы JSON-массива из файла по одному, без чтения файла целиком.
+
+    В памяти держится только текущий фрагмент файла, поэтому так можно
+    читать дампы любого размера в формате `dumpdata`.
+    """
+
+    def __init__(self, file, chunk_size=CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer, self.pos, self.eof = '', 0, False
+
+    def read(self):
+        """Дочитывает фрагмент файла к ещё не разобранному хвосту буфера."""
+        chunk = '' if self.eof else self.file.read(self.chunk_size)
+        self.eof = not chunk
+        self.buffer, self.pos = self.buffer[self.pos:] + chunk, 0
+        return bool(chunk)
+
+    def skip(self, characters):
+        while True:
+            while (
+                self.pos < len(self.buffer)
+                and self.buffer[self.pos] in characters
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.read():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def decode(self):
+        while True:
+            try:
+                item, self.pos = self.decoder.raw_decode(
+                    self.buffer, self.pos
+                )
+                return item
+            except json.JSONDecodeError:
+                if not self.read():
+                    raise
+
+    def __iter__(self):
+        if self.skip(WHITESPACE) != '[':
+            raise ValueError('Дамп должен быть JSON-массивом.')
+        self.pos += 1
+        while True:
+            next_character = self.skip(WHITESPACE + ',')
+            if not next_character:
+                raise ValueError('Дамп оборвался: нет закрывающей скобки.')
+            if next_character == ']':
+                return
+            yield self.decode()
+
+
+def iter_json_array(file, chunk_size=CHUNK_SIZE):
+    return iter(JSONArrayReader(file, chunk_size))
+
+
+def export_querysets():
+    """Выгружаемые таблицы: поля и связанные объекты, взятые одним JOIN."""
+    return {
+        'posts': Post.objects.values(
+            'id', 'title', 'text', 'pub_date', 'created_at', 'updated_at',
+            'is_published', 'comment_count', 'image',
+            author_username=F('author__username'),
+            category_slug=F('category__slug'),
+            location_name=F('location__name'),
+        ),
+        'comments': Comment.objects.values(
+            'id', 'post_id', 'text', 'created_at',
+            author_username=F('author__username'),
+        ),
+    }
+
+
+def export_rows(table, after_id=0, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки таблицы по возрастанию id, начиная после `after_id`.
+
+    Строки читаются из БД кусками по `chunk_size`, поэтому память не
+    зависит от размера таблицы, а прерванную выгрузку можно продолжить
+    с последнего записанного id.
+    """
+    queryset = export_querysets()[table]
+    return queryset.filter(id__gt=after_id).order_by('id').iterator(
+        chunk_size=chunk_size
+    )
+
+
+class LineBuffer:
+    """Файлоподобный объект для csv.writer: возвращает строку, а не пишет."""
+
+    def write(self, line):
+        return line
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield '\n'
+
+
+def iter_csv(rows, header=True):
+    writer = csv.writer(LineBuffer())
+    for number, row in enumerate(rows):
+        if header and number == 0:
+            yield writer.writerow(row.keys())
+        yield writer.writerow(row.values())
+
+
+def iter_export(
+    table, export_format, after_id=0, chunk_size=EXPORT_CHUNK_SIZE
+):
+    """Выгрузка таблицы в формате `jsonl` или `csv` построчно.
+
+    Заголовок CSV пишется только при выгрузке с начала, чтобы продолжение
+    можно было дописать в тот же файл.
+    """
+    rows = export_rows(table, after_id, chunk_size)
+    if export_format == 'csv':
+        return iter_csv(rows, header=not after_id)
+    return iter_jsonl(rows)
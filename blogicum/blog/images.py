@@ -0,0 +1,73 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Ширина вариантов фото: карточка в ленте и страница поста.
+IMAGE_VARIANTS = (
+    ('feed', 640),
+    ('detail', 1280),
+)
+# Формат Pillow, расширение файла и параметры сохранения.
+IMAGE_FORMATS = (
+    ('jpeg', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    ('webp', 'webp', {'quality': 80, 'method': 4}),
+)
+VARIANTS_DIR = 'variants'
+
+
+def variant_name(name, variant, extension):
+    stem = PurePosixPath(name).stem
+    return f'{VARIANTS_DIR}/{stem}_{variant}.{extension}'
+
+
+def resize(image, width):
+    """Уменьшает фото до ширины `width`, не увеличивая маленькие."""
+    if image.width <= width:
+        return image.copy()
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def delete_variants(storage, variants):
+    for variant in variants.values():
+        for format_name, _, _ in IMAGE_FORMATS:
+            if variant.get(format_name):
+                storage.delete(variant[format_name])
+
+
+def make_variants(storage, name):
+    """Сохраняет уменьшенные копии фото `name` рядом с оригиналом.
+
+    Возвращает описание вариантов для `Post.image_variants`:
+    `{'feed': {'width': 640, 'jpeg': 'variants/...', 'webp': ...}, ...}`.
+    Функция не обращается к БД, поэтому её можно выполнять в отдельном
+    процессе.
+    """
+    with storage.open(name, 'rb') as original:
+        image = Image.open(original)
+        if image.width * image.height > settings.BLOG_IMAGE_MAX_PIXELS:
+            raise ValueError(
+                f'Слишком большое изображение: {image.width}x{image.height}.'
+            )
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGB')
+    variants = {}
+    previous = None
+    for variant, width in IMAGE_VARIANTS:
+        if previous and previous['width'] == min(width, image.width):
+            variants[variant] = previous
+            continue
+        resized = resize(image, width)
+        variants[variant] = {'width': resized.width}
+        for format_name, extension, options in IMAGE_FORMATS:
+            buffer = BytesIO()
+            resized.save(buffer, format=format_name, **options)
+            variants[variant][format_name] = storage.save(
+                variant_name(name, variant, extension),
+                ContentFile(buffer.getvalue())
+            )
+        previous = variants[variant]
+    return variants
@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .images import delete_variants, make_variants
+from .models import ImageJob, Post
+
+MAX_ATTEMPTS = 3
+# Задание в работе дольше этого срока считается брошенным упавшим
+# обработчиком и возвращается в очередь.
+STALE_AFTER = timedelta(minutes=10)
+# Пауза перед повтором упавшего задания, удваивается с каждой попыткой.
+RETRY_DELAY = timedelta(minutes=1)
+
+
+def requeue_stale_jobs():
+    return ImageJob.objects.filter(
+        status=ImageJob.Status.RUNNING,
+        started_at__lt=timezone.now() - STALE_AFTER
+    ).update(status=ImageJob.Status.PENDING)
+
+
+def claim_jobs(limit):
+    """Забирает до `limit` заданий из очереди.
+
+    Задание переводится в работу условным UPDATE, поэтому два обработчика
+    не возьмут одно и то же задание. Упавшие задания ждут своей очереди
+    до `available_at`.
+    """
+    claimed = []
+    pending = ImageJob.objects.filter(
+        status=ImageJob.Status.PENDING, available_at__lte=timezone.now()
+    ).values_list('pk', flat=True)[:limit]
+    for pk in pending:
+        if ImageJob.objects.filter(
+            pk=pk, status=ImageJob.Status.PENDING
+        ).update(status=ImageJob.Status.RUNNING, started_at=timezone.now()):
+            claimed.append(pk)
+    return list(ImageJob.objects.filter(pk__in=claimed))
+
+
+def render_variants(name):
+    """Выполняется в процессе пула: только файлы, без обращений к БД."""
+    return make_variants(default_storage, name)
+
+
+class InlineResult:
+    """Результат, посчитанный сразу, с тем же интерфейсом, что у пула."""
+
+    def __init__(self, name):
+        try:
+            self.value, self.error = render_variants(name), None
+        except Exception as error:
+            self.value, self.error = None, error
+
+    def get(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def finish_job(job, variants):
+    post = Post.objects.filter(pk=job.post_id).first()
+    if post is None or post.image.name != job.image:
+        # Пока задание ждало, фото сменили или пост удалили.
+        delete_variants(default_storage, variants)
+    else:
+        post.set_image_variants(variants)
+    job.delete()
+
+
+def fail_job(job, error):
+    job.attempts += 1
+    job.error = f'{type(error).__name__}: {error}'
+    job.status = (
+        ImageJob.Status.FAILED if job.attempts >= MAX_ATTEMPTS
+        else ImageJob.Status.PENDING
+    )
+    job.available_at = (
+        timezone.now() + RETRY_DELAY * 2 ** (job.attempts - 1)
+    )
+    job.save(update_fields=('attempts', 'error', 'status', 'available_at'))
+
+
+def process_jobs(limit, pool=None):
+    """Обрабатывает одну пачку заданий и возвращает их число.
+
+    С пулом процессов Pillow работает в дочерних процессах, а результаты
+    в БД записывает текущий процесс.
+    """
+    requeue_stale_jobs()
+    jobs = claim_jobs(limit)
+    if pool is None:
+        results = [InlineResult(job.image) for job in jobs]
+    else:
+        results = [
+            pool.apply_async(render_variants, (job.image,)) for job in jobs
+        ]
+    for job, result in zip(jobs, results):
+        try:
+            variants = result.get()
+        except Exception as error:
+            fail_job(job, error)
+        else:
+            finish_job(job, variants)
+    return len(jobs)
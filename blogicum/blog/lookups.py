@@ -0,0 +1,119 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .caching import get_version
+from .models import Category, Location, Post
+
+# Страховка на случай, если версию увеличили до фиксации транзакции и
+# процесс успел перечитать справочник со старыми данными.
+MAX_AGE = 300
+# Бэкенды, чьи версии видит только свой процесс.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def lookups_enabled():
+    """Можно ли брать категории и места из справочников в памяти.
+
+    Справочники узнают о правках из версий в кэше, поэтому с кэшем
+    внутри процесса они отключены, если не включены настройкой
+    `BLOG_IN_PROCESS_LOOKUPS` явно.
+    """
+    if settings.BLOG_IN_PROCESS_LOOKUPS is not None:
+        return settings.BLOG_IN_PROCESS_LOOKUPS
+    return not isinstance(caches['default'], PROCESS_LOCAL_CACHES)
+
+
+class VersionedLookup:
+    """Небольшой справочник из БД в памяти процесса.
+
+    Объекты справочника общие для всех запросов и потоков процесса и
+    только читаются; постам достаются их копии.
+
+    Справочник перечитывается, когда меняется версия его пространства имён
+    в общем кэше, поэтому правка в одном процессе видна всем остальным,
+    а в обычном запросе стоит одного обращения к кэшу вместо запроса к БД.
+    """
+
+    def __init__(self, namespace, load):
+        self.namespace = namespace
+        self.load = load
+        self.state = (None, 0, None)
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        version = get_version(self.namespace)
+        cached_version, loaded_at, data = self.state
+        age = time.monotonic() - loaded_at
+        if cached_version == version and age < MAX_AGE:
+            return data
+        with self.lock:
+            data = self.load()
+            self.state = (version, time.monotonic(), data)
+        return data
+
+
+class Categories:
+    """Все категории: по id для карточек и опубликованные — для ленты."""
+
+    def __init__(self, categories):
+        self.by_id = {category.pk: category for category in categories}
+        self.published_by_slug = {
+            category.slug: category
+            for category in categories if category.is_published
+        }
+        self.published_ids = sorted(
+            category.pk for category in self.published_by_slug.values()
+        )
+
+
+def load_categories():
+    return Categories(list(Category.objects.all()))
+
+
+def load_locations():
+    return {location.pk: location for location in Location.objects.all()}
+
+
+categories = VersionedLookup('categories', load_categories)
+locations = VersionedLookup('locations', load_locations)
+
+
+def attach_feed_relations(posts):
+    """Проставляет постам категорию и местоположение из справочников.
+
+    Каждый пост получает свою копию объекта из справочника, так что
+    правка связи одного поста не заденет другие запросы. Уже загруженные
+    связи не меняются, а тех, что нет в справочнике, при обращении
+    загрузит из БД Django. Возвращает список постов.
+    """
+    posts = list(posts)
+    if not lookups_enabled():
+        return posts
+    by_field = (
+        (Post._meta.get_field('category'), categories().by_id),
+        (Post._meta.get_field('location'), locations()),
+    )
+    for post in posts:
+        for field, lookup in by_field:
+            if field.is_cached(post):
+                continue
+            related_id = getattr(post, field.attname)
+            if related_id is None:
+                field.set_cached_value(post, None)
+            elif related_id in lookup:
+                field.set_cached_value(post, copy.copy(lookup[related_id]))
+    return posts
+
+
+def published_category(slug):
+    """Опубликованная категория по slug или None."""
+    if not lookups_enabled():
+        return Category.objects.filter(slug=slug, is_published=True).first()
+    category = categories().published_by_slug.get(slug)
+    return copy.copy(category)
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from blog.dumps import (
+    EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_querysets, iter_export
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты или комментарии в JSONL или CSV. '
+        'Прерванную выгрузку можно продолжить с --after-id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=list(export_querysets()))
+        parser.add_argument(
+            '--format', dest='export_format', choices=EXPORT_FORMATS,
+            default='jsonl'
+        )
+        parser.add_argument(
+            '-o', '--output',
+            help='Файл для выгрузки; без него — стандартный вывод.'
+        )
+        parser.add_argument(
+            '--after-id', type=int, default=0,
+            help='Выгрузить только строки с id больше этого.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из БД за раз.'
+        )
+
+    def handle(self, *args, table, export_format, output, after_id,
+               chunk_size, **options):
+        lines = iter_export(table, export_format, after_id, chunk_size)
+        if output is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        # Продолжение выгрузки дописывается в конец файла.
+        mode = 'a' if after_id else 'w'
+        with open(output, mode, encoding='utf-8', newline='') as file:
+            file.writelines(lines)
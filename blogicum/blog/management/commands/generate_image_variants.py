@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import ImageJob, Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии фото для уже загруженных постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии и у постов, где они уже есть.'
+        )
+        parser.add_argument(
+            '--enqueue', action='store_true',
+            help='Не создавать копии сразу, а поставить их в очередь.'
+        )
+
+    def handle(self, *args, all, enqueue, **options):
+        posts = Post.objects.exclude(image='')
+        if not all:
+            posts = posts.filter(image_variants={})
+        if enqueue:
+            posts = posts.exclude(
+                image_jobs__status__in=(
+                    ImageJob.Status.PENDING, ImageJob.Status.RUNNING
+                )
+            )
+        done = failed = 0
+        for post in posts.only('pk', 'image', 'image_variants').iterator():
+            if enqueue:
+                post.schedule_image_variants()
+                done += 1
+                continue
+            try:
+                post.generate_image_variants()
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'Пост {post.pk}: {error}')
+            else:
+                done += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Готово: {done}, с ошибками: {failed}.')
+        )
@@ -0,0 +1,48 @@
+import os
+import time
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand
+
+from blog.jobs import process_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Обработчик очереди ImageJob: создаёт уменьшенные копии фото '
+        'в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Число процессов Pillow; 0 — обрабатывать в этом процессе.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=20,
+            help='Сколько заданий забирать из очереди за раз.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=2,
+            help='Пауза при пустой очереди, в секундах.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь и завершиться.'
+        )
+
+    def handle(self, *args, workers, batch_size, sleep, once, **options):
+        pool = Pool(workers) if workers > 0 else None
+        try:
+            while True:
+                processed = process_jobs(batch_size, pool=pool)
+                if processed:
+                    self.stdout.write(f'Обработано заданий: {processed}.')
+                elif once:
+                    return
+                else:
+                    time.sleep(sleep)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from blog.models import Post
+from blog.search import create_index, drop_index, fts_available, index_posts
+
+
+class Command(BaseCommand):
+    help = 'Заново строит полнотекстовый индекс постов (SQLite FTS5).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов индексировать за раз.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        if not fts_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        indexed = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            drop_index(cursor)
+            create_index(cursor)
+            batch = []
+            for post in Post.objects.values_list(
+                'pk', 'title', 'text'
+            ).iterator(chunk_size=batch_size):
+                batch.append(post)
+                if len(batch) == batch_size:
+                    index_posts(cursor, batch)
+                    indexed += len(batch)
+                    batch = []
+            index_posts(cursor, batch)
+            indexed += len(batch)
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано постов: {indexed}.')
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+
+from blog.models import Post, actual_comment_count
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count по таблице комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Сколько постов обновлять в одной транзакции.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        bounds = Post.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        if bounds['first'] is None:
+            self.stdout.write('Постов нет.')
+            return
+        fixed = 0
+        for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+            with transaction.atomic():
+                fixed += Post.objects.filter(
+                    pk__gte=start, pk__lt=start + batch_size
+                ).exclude(
+                    comment_count=actual_comment_count()
+                ).update(comment_count=actual_comment_count())
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {fixed}.')
+        )
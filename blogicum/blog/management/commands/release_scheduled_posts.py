@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.caching import (
+    release_scheduled_posts, seconds_until_next_publication
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сбрасывает кэш лент в момент выхода отложенных постов. '
+        'С --loop работает постоянно и просыпается к дате следующего поста.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать следующих публикаций.'
+        )
+        parser.add_argument(
+            '--max-sleep', type=int, default=60,
+            help='Наибольшая пауза между проверками, в секундах.'
+        )
+
+    def handle(self, *args, loop, max_sleep, **options):
+        while True:
+            released = release_scheduled_posts()
+            if released:
+                self.stdout.write(f'Вышло отложенных постов: {released}.')
+            if not loop:
+                return
+            until_next = seconds_until_next_publication()
+            time.sleep(min(max_sleep, until_next or max_sleep))
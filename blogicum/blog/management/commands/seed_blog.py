@@ -0,0 +1,226 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog.caching import bump_versions, forget_next_publication
+from blog.models import Category, Comment, Location, Post
+from blog.search import fts_available, index_posts
+
+User = get_user_model()
+
+# Показатель степенного распределения: чем меньше, тем сильнее перекос
+# в сторону немногих активных авторов и обсуждаемых постов.
+AUTHOR_EXPONENT = 1.1
+THREAD_ALPHA = 1.2
+FUTURE_POSTS_SHARE = 0.05
+UNPUBLISHED_SHARE = 0.05
+VOCABULARY_SIZE = 3000
+
+
+def batched(objects, size):
+    iterator = iter(objects)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт большой синтетический набор пользователей, категорий, '
+        'местоположений, постов и комментариев.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=500)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument(
+            '--comments', type=int, default=500_000,
+            help='Примерное число комментариев.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=1,
+            help='Зерно генератора: с тем же зерном данные те же.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько строк вставлять в одной транзакции.'
+        )
+        parser.add_argument(
+            '--skip-search-index', action='store_true',
+            help='Не индексировать посты; потом — rebuild_search_index.'
+        )
+
+    def handle(self, *args, **options):
+        self.seed = options['seed']
+        self.batch_size = options['batch_size']
+        self.rng = random.Random(self.seed)
+        fake = Faker('ru_RU')
+        fake.seed_instance(self.seed)
+        self.words = sorted(set(fake.words(nb=VOCABULARY_SIZE)))
+        self.cities = sorted(set(fake.city() for _ in range(1000)))
+        self.now = timezone.now()
+        if User.objects.filter(username=self.username(0)).exists():
+            raise CommandError(
+                f'Данные с зерном {self.seed} уже созданы, задайте --seed.'
+            )
+
+        user_ids = self.create_users(options['users'])
+        category_ids = self.create_categories(options['categories'])
+        location_ids = self.create_locations(options['locations'])
+        post_ids, thread_sizes = self.create_posts(
+            options['posts'], options['comments'],
+            user_ids, category_ids, location_ids
+        )
+        self.create_comments(post_ids, thread_sizes, user_ids)
+        if not options['skip_search_index'] and fts_available():
+            self.index_posts(post_ids)
+        bump_versions(
+            ('posts', 'comments', 'categories', 'locations', 'users')
+        )
+        forget_next_publication()
+
+    def username(self, number):
+        return f'seed{self.seed}_{number}'
+
+    def sentence(self, min_words, max_words):
+        words = self.rng.choices(
+            self.words, k=self.rng.randint(min_words, max_words)
+        )
+        return ' '.join(words).capitalize()
+
+    def paragraph(self, min_sentences, max_sentences):
+        return ' '.join(
+            self.sentence(4, 14) + '.'
+            for _ in range(self.rng.randint(min_sentences, max_sentences))
+        )
+
+    def insert(self, model, objects, total):
+        """Вставляет объекты пачками, по транзакции на пачку.
+
+        Возвращает id созданных строк по порядку вставки.
+        """
+        started = time.monotonic()
+        last_pk = model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        for batch in batched(objects, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {total} '
+            f'за {elapsed:.1f} с ({total / max(elapsed, 1e-3):.0f} в секунду).'
+        )
+        return list(
+            model.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', flat=True
+            )
+        )
+
+    def create_users(self, count):
+        return self.insert(User, (
+            User(username=self.username(number), password='!')
+            for number in range(count)
+        ), count)
+
+    def create_categories(self, count):
+        return self.insert(Category, (
+            Category(
+                title=self.sentence(1, 3)[:256],
+                description=self.paragraph(1, 3),
+                slug=f'seed{self.seed}-{number}',
+                is_published=self.rng.random() > UNPUBLISHED_SHARE,
+            )
+            for number in range(count)
+        ), count)
+
+    def create_locations(self, count):
+        return self.insert(Location, (
+            Location(
+                name=self.rng.choice(self.cities),
+                is_published=self.rng.random() > UNPUBLISHED_SHARE,
+            )
+            for _ in range(count)
+        ), count)
+
+    def pub_date(self):
+        """Дата публикации за последние два года или отложенная вперёд."""
+        if self.rng.random() < FUTURE_POSTS_SHARE:
+            return self.now + timedelta(days=self.rng.uniform(0, 30))
+        return self.now - timedelta(days=self.rng.uniform(0, 730))
+
+    def thread_sizes(self, posts, comments):
+        """Число комментариев у каждого поста с тяжёлым хвостом.
+
+        Веса постов берутся из распределения Парето, поэтому большинство
+        постов почти не обсуждают, а немногие собирают длинные ветки.
+        """
+        weights = [self.rng.paretovariate(THREAD_ALPHA) for _ in range(posts)]
+        total = sum(weights) or 1
+        return [round(comments * weight / total) for weight in weights]
+
+    def create_posts(self, count, comments, user_ids, category_ids,
+                     location_ids):
+        if not user_ids and count:
+            raise CommandError('Для постов нужен хотя бы один автор.')
+        author_weights = list(accumulate(
+            1 / (rank + 1) ** AUTHOR_EXPONENT for rank in range(len(user_ids))
+        ))
+        thread_sizes = self.thread_sizes(count, comments)
+        post_ids = self.insert(Post, (
+            Post(
+                title=self.sentence(3, 8)[:256],
+                text=self.paragraph(2, 10),
+                pub_date=self.pub_date(),
+                author_id=self.rng.choices(
+                    user_ids, cum_weights=author_weights
+                )[0],
+                category_id=(
+                    self.rng.choice(category_ids) if category_ids else None
+                ),
+                location_id=(
+                    self.rng.choice(location_ids)
+                    if location_ids and self.rng.random() < 0.7 else None
+                ),
+                is_published=self.rng.random() > UNPUBLISHED_SHARE,
+                comment_count=thread_sizes[number],
+            )
+            for number in range(count)
+        ), count)
+        return post_ids, thread_sizes
+
+    def create_comments(self, post_ids, thread_sizes, user_ids):
+        total = sum(thread_sizes)
+        self.insert(Comment, (
+            Comment(
+                text=self.sentence(3, 30),
+                post_id=post_id,
+                author_id=self.rng.choice(user_ids),
+            )
+            for post_id, size in zip(post_ids, thread_sizes)
+            for _ in range(size)
+        ), total)
+
+    def index_posts(self, post_ids):
+        if not post_ids:
+            return
+        started = time.monotonic()
+        posts = Post.objects.filter(pk__gte=post_ids[0]).values_list(
+            'pk', 'title', 'text'
+        ).iterator(chunk_size=self.batch_size)
+        with connection.cursor() as cursor:
+            for batch in batched(posts, self.batch_size):
+                with transaction.atomic():
+                    index_posts(cursor, batch)
+        self.stdout.write(
+            f'Поисковый индекс: {len(post_ids)} постов '
+            f'за {time.monotonic() - started:.1f} с.'
+        )
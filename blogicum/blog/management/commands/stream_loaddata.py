@@ -0,0 +1,162 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers import base
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from blog.caching import bump_versions, forget_next_publication
+from blog.dumps import iter_json_array, open_dump
+from blog.models import Comment, Post, actual_comment_count
+from blog.search import fts_available, index_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает фикстуру в формате dumpdata (JSON, можно .gz, '
+        '.bz2, .xz) пачками bulk_create, не читая файл в память целиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к файлу фикстуры.')
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Сколько объектов одной модели сохранять за раз.'
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База данных для загрузки.'
+        )
+        parser.add_argument(
+            '-i', '--ignorenonexistent', action='store_true',
+            help='Пропускать поля, которых нет в моделях.'
+        )
+
+    def handle(self, *args, fixture, batch_size, database, **options):
+        self.using = database
+        self.batch_size = batch_size
+        self.ignorenonexistent = options['ignorenonexistent']
+        self.batches = defaultdict(list)
+        self.deferred = []
+        self.loaded = defaultdict(int)
+        self.post_ids = set()
+        self.started = time.monotonic()
+        connection = connections[database]
+        try:
+            with open_dump(fixture) as file, transaction.atomic(database):
+                # Как и loaddata, проверяем внешние ключи один раз в конце:
+                # объекты в дампе могут ссылаться на ещё не загруженные.
+                with connection.constraint_checks_disabled():
+                    for item in iter_json_array(file):
+                        self.add(item)
+                    for model in list(self.batches):
+                        self.flush(model)
+                    for deserialized in self.deferred:
+                        deserialized.save_deferred_fields(using=database)
+                connection.check_constraints(
+                    table_names=[model._meta.db_table for model in self.loaded]
+                )
+                self.reset_sequences(connection)
+        except (OSError, ValueError, base.DeserializationError) as error:
+            raise CommandError(f'Не удалось загрузить {fixture}: {error}')
+        bump_versions(
+            ('posts', 'comments', 'categories', 'locations', 'users')
+        )
+        forget_next_publication()
+        self.recount_comments()
+        self.report()
+
+    def add(self, item):
+        for deserialized in Deserializer(
+            [item], using=self.using,
+            ignorenonexistent=self.ignorenonexistent,
+            handle_forward_references=True
+        ):
+            model = type(deserialized.object)
+            self.batches[model].append(deserialized)
+            if len(self.batches[model]) >= self.batch_size:
+                self.flush(model)
+
+    def flush(self, model):
+        """Сохраняет накопленные объекты модели без сигналов.
+
+        Объекты, чьи pk уже есть в базе, обновляются, как при loaddata,
+        остальные вставляются одним bulk_create.
+        """
+        batch = self.batches.pop(model, [])
+        if not batch:
+            return
+        manager = model._base_manager.using(self.using)
+        objects = [deserialized.object for deserialized in batch]
+        existing = set(manager.filter(
+            pk__in=[obj.pk for obj in objects if obj.pk is not None]
+        ).values_list('pk', flat=True))
+        new = [obj for obj in objects if obj.pk not in existing]
+        old = [obj for obj in objects if obj.pk in existing]
+        manager.bulk_create(new)
+        if old:
+            fields = [
+                field for field in model._meta.concrete_fields
+                if not field.primary_key
+            ]
+            for obj in old:
+                # bulk_update, в отличие от save, не заполняет auto_now.
+                for field in fields:
+                    setattr(obj, field.attname, field.pre_save(obj, False))
+            manager.bulk_update(old, [field.name for field in fields])
+        for deserialized in batch:
+            if deserialized.m2m_data:
+                self.save_m2m(deserialized)
+            if deserialized.deferred_fields:
+                self.deferred.append(deserialized)
+        self.remember_posts(model, objects)
+        if model is Post and fts_available(connections[self.using]):
+            with connections[self.using].cursor() as cursor:
+                index_posts(
+                    cursor, [(obj.pk, obj.title, obj.text) for obj in objects]
+                )
+        self.loaded[model] += len(batch)
+
+    def remember_posts(self, model, objects):
+        if model is Post:
+            self.post_ids.update(obj.pk for obj in objects)
+        elif model is Comment:
+            self.post_ids.update(obj.post_id for obj in objects)
+
+    def recount_comments(self):
+        """Пересчитывает comment_count загруженных постов.
+
+        В старых дампах счётчика нет, а комментарии вставляются без
+        сигналов, поэтому он берётся из таблицы комментариев.
+        """
+        post_ids = sorted(self.post_ids)
+        for start in range(0, len(post_ids), self.batch_size):
+            Post.objects.using(self.using).filter(
+                pk__in=post_ids[start:start + self.batch_size]
+            ).exclude(
+                comment_count=actual_comment_count()
+            ).update(comment_count=actual_comment_count())
+
+    def save_m2m(self, deserialized):
+        obj = deserialized.object
+        for name, values in deserialized.m2m_data.items():
+            getattr(obj, name).set(values)
+
+    def reset_sequences(self, connection):
+        sql = connection.ops.sequence_reset_sql(no_style(), list(self.loaded))
+        if sql:
+            with connection.cursor() as cursor:
+                for line in sql:
+                    cursor.execute(line)
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        total = sum(self.loaded.values())
+        for model, count in self.loaded.items():
+            self.stdout.write(f'{model._meta.label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-3):.0f} в секунду).'
+        ))
@@ -0,0 +1,68 @@
+import re
+
+import snowballstemmer
+from django.db import migrations
+
+# Копия правил из blog.search на момент миграции: миграция не должна
+# меняться вместе с кодом приложения. Если правила нормализации потом
+# изменятся, индекс перестраивает команда rebuild_search_index.
+BATCH_SIZE = 1000
+WORD_RE = re.compile(r'\w+')
+CYRILLIC_RE = re.compile('[а-я]')
+STEMMERS = {
+    'russian': snowballstemmer.stemmer('russian'),
+    'english': snowballstemmer.stemmer('english'),
+}
+
+CREATE_INDEX_SQL = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts USING fts5('
+    "title, text, tokenize='unicode61 remove_diacritics 2')"
+)
+INSERT_SQL = (
+    'INSERT INTO blog_post_fts (rowid, title, text) VALUES (%s, %s, %s)'
+)
+DROP_INDEX_SQL = 'DROP TABLE IF EXISTS blog_post_fts'
+
+
+def normalize(text):
+    words = WORD_RE.findall(text.lower().replace('ё', 'е'))
+    return ' '.join(
+        STEMMERS[
+            'russian' if CYRILLIC_RE.search(word) else 'english'
+        ].stemWord(word)
+        for word in words
+    )
+
+
+def build_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Post = apps.get_model('blog', 'Post')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_INDEX_SQL)
+        batch = []
+        for pk, title, text in Post.objects.values_list(
+            'pk', 'title', 'text'
+        ).iterator(chunk_size=BATCH_SIZE):
+            batch.append((pk, normalize(title), normalize(text)))
+            if len(batch) == BATCH_SIZE:
+                cursor.executemany(INSERT_SQL, batch)
+                batch = []
+        cursor.executemany(INSERT_SQL, batch)
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(DROP_INDEX_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_imagejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_search_index, remove_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:11
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_author_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='available_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Упавшее задание повторяется не раньше этого времени.', verbose_name='Не раньше'),
+        ),
+    ]
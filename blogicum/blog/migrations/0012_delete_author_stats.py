@@ -0,0 +1,16 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_imagejob_available_at'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='AuthorStats',
+        ),
+    ]
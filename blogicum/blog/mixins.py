@@ -1,23 +1,205 @@
-from django.db.models import Count
-from django.shortcuts import get_object_or_404, redirect
-from django.utils import timezone
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from .caching import cap_timeout, get_version
 from .forms import CreateComment, CreatePost
+from .lookups import attach_feed_relations
 from .models import Comment, Post
+from .paginators import (
+    CachedCountPaginator, encode_cursor, paginate_by_cursor
+)
+from .uploads import LimitedImageUploadHandler
+
+
+class CursorPaginationMixin:
+    """Keyset-пагинация ленты по параметрам `after`/`before`.
+
+    Без этих параметров работает обычная постраничная навигация, а
+    ссылка «Старее» с неё ведёт уже в режим курсоров.
+    """
+
+    def paginate_queryset(self, queryset, page_size):
+        after = self.request.GET.get('after')
+        before = self.request.GET.get('before')
+        if after or before:
+            page = paginate_by_cursor(
+                queryset, page_size, after=after, before=before
+            )
+            return None, page, page.object_list, page.has_other_pages()
+        paginator, page, object_list, is_paginated = (
+            super().paginate_queryset(queryset, page_size)
+        )
+        page.object_list = list(object_list)
+        if page.has_next() and page.object_list:
+            page.next_cursor = encode_cursor(page.object_list[-1])
+        return paginator, page, page.object_list, is_paginated
+
+
+class FeedRelationsMixin:
+    """Проставляет постам страницы категории и места из справочников.
+
+    Должен стоять раньше миксинов, меняющих пагинацию, чтобы работать
+    с уже выбранной страницей.
+    """
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, object_list, is_paginated = (
+            super().paginate_queryset(queryset, page_size)
+        )
+        page.object_list = attach_feed_relations(object_list)
+        return paginator, page, page.object_list, is_paginated
+
+
+class ElidedPageRangeMixin:
+    """Номера страниц для навигации: первые, последние и окно у текущей.
+
+    Вместо ссылки на каждую страницу шаблон получает `page_range` из
+    пары десятков элементов с многоточиями на месте пропусков.
+    """
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        paginator = context.get('paginator')
+        page = context.get('page_obj')
+        if paginator is not None and page is not None:
+            context['page_range'] = paginator.get_elided_page_range(
+                page.number
+            )
+        return context
+
+
+class AnonymousPageCacheMixin:
+    """Кэширует страницу целиком для анонимных пользователей.
+
+    Ключ зависит от пути, от параметров запроса из `page_cache_params`
+    и от версий пространств имён из `page_cache_namespaces`. Прочие
+    параметры в ключ не входят, чтобы случайные строки запроса не
+    плодили записи в кэше и не обходили его. В именах пространств можно
+    использовать параметры URL, например `post:{post_id}`. Если страница
+    зависит от постов, кэш живёт не дольше, чем до выхода ближайшего
+    отложенного поста.
+    """
+
+    page_cache_namespaces = ()
+    page_cache_params = ('page', 'after', 'before')
+
+    def get_page_cache_key(self):
+        versions = '.'.join(
+            str(get_version(namespace.format(**self.kwargs)))
+            for namespace in self.page_cache_namespaces
+        )
+        query = urlencode([
+            (name, self.request.GET[name])
+            for name in self.page_cache_params if name in self.request.GET
+        ])
+        url = f'{self.request.path}?{query}'
+        path = hashlib.md5(url.encode()).hexdigest()
+        return f'blog:page:{versions}:{path}'
+
+    def get_page_cache_timeout(self):
+        if 'posts' in self.page_cache_namespaces:
+            return cap_timeout(settings.BLOG_PAGE_CACHE_TIMEOUT)
+        return settings.BLOG_PAGE_CACHE_TIMEOUT
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = self.get_page_cache_key()
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = self.get_page_cache_timeout()
+            if hasattr(response, 'render') and callable(response.render):
+                response.add_post_render_callback(
+                    lambda rendered: cache.set(key, rendered, timeout)
+                )
+            else:
+                cache.set(key, response, timeout)
+        return response
+
+
+class CachedCountMixin:
+    """Подключает CachedCountPaginator с ключом из get_count_cache_key().
+
+    По умолчанию ключ собирается из имени представления и параметров
+    URL; если число зависит от чего-то ещё, например от пользователя,
+    метод нужно переопределить.
+    """
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_cache_key(self):
+        params = ':'.join(
+            f'{name}={value}' for name, value in sorted(self.kwargs.items())
+        )
+        return f'{type(self).__name__}:{params}'
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args, cache_key=self.get_count_cache_key(), **kwargs
+        )
+
 
+class PostCardCacheMixin:
+    """Передаёт в шаблон параметры кэша карточек постов.
 
-class PostsFilter:
-    def get_filtred_posts(self, model):
-        return model.filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=timezone.now()
+    Карточка кэшируется по id поста, времени его изменения и числу
+    комментариев, а `post_card_version` меняется при правке любой
+    категории, местоположения или пользователя.
+    """
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post_card_version'] = '.'.join(
+            str(get_version(namespace))
+            for namespace in ('categories', 'locations', 'users')
         )
+        context['post_card_timeout'] = settings.BLOG_POST_CARD_CACHE_TIMEOUT
+        return context
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class LimitedImageUploadMixin:
+    """Подключает LimitedImageUploadHandler к загрузке фото поста.
+
+    Обработчики загрузки нельзя сменить после чтения request.POST, а его
+    читает CSRF-middleware, поэтому проверка CSRF перенесена внутрь
+    dispatch, после замены обработчиков. Миксин должен стоять первым
+    среди родителей представления.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [LimitedImageUploadHandler(request)]
+        return self.csrf_protected_dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
+    def csrf_protected_dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        error = getattr(self.request, 'image_upload_error', None)
+        if error:
+            form.add_error('image', error)
+        return form
+
 
-    def get_annotate(self, queryset):
-        return queryset.annotate(
-            comment_count=Count('comments')
-        ).order_by('-pub_date')
+class ImageVariantsMixin:
+    """Ставит в очередь создание копий нового фото поста."""
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if 'image' in form.changed_data:
+            self.object.schedule_image_variants()
+        return response
 
 
 class SuccessRedirectToProfileMixin:
@@ -34,15 +216,16 @@ class SuccessRedirectToPostMixin:
         )
 
 
-class PostMixin:
-    model = Post
-    form_class = CreatePost
-    template_name = 'blog/create.html'
-    pk_url_kwarg = 'post_id'
+class AuthorObjectMixin:
+    """Объект автора загружается один раз за запрос.
+
+    Тот же объект идёт на проверку авторства, в форму и в шаблон;
+    чужой пост или комментарий ведёт на страницу поста.
+    """
 
     def dispatch(self, request, *args, **kwargs):
-        post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        if self.request.user != post.author:
+        self.object = self.get_object()
+        if self.object.author_id != request.user.pk:
             return redirect(
                 reverse(
                     'blog:post_detail',
@@ -51,33 +234,36 @@ class PostMixin:
             )
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        if getattr(self, 'object', None) is None:
+            self.object = super().get_object(queryset)
+        return self.object
+
+
+class PostMixin(AuthorObjectMixin):
+    model = Post
+    form_class = CreatePost
+    template_name = 'blog/create.html'
+    pk_url_kwarg = 'post_id'
+
+    def get_queryset(self):
+        return Post.objects.with_feed_relations()
+
+    def get_object(self, queryset=None):
+        return attach_feed_relations([super().get_object(queryset)])[0]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        context['form'] = CreatePost(instance=post)
+        # У DeleteView нет формы, а шаблон показывает пост через неё.
+        context.setdefault('form', CreatePost(instance=self.object))
         return context
 
 
-class CommentMixin:
+class CommentMixin(AuthorObjectMixin):
     model = Comment
     form_class = CreateComment
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        comment = get_object_or_404(Comment, pk=self.kwargs['comment_id'])
-        if self.request.user != comment.author:
-            return redirect(
-                reverse(
-                    'blog:post_detail',
-                    kwargs={'post_id': self.kwargs['post_id']}
-                )
-            )
-        return super().dispatch(request, *args, **kwargs)
-
-    def get_context_data(self, **kwarg):
-        context = super().get_context_data(**kwarg)
-        context['comment_id'] = Comment.objects.filter(
-            pk=self.kwargs['comment_id']
-        )
-        return context
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['post_id'])
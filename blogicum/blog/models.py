@@ -2,6 +2,12 @@ from core.models import PublishedCreatedModel
 
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.fields.related_lookups import RelatedIn
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .images import delete_variants, make_variants
 
 User = get_user_model()
 
@@ -36,6 +42,78 @@ class Location(PublishedCreatedModel):
         return self.name
 
 
+@models.ForeignKey.register_lookup
+class UnindexedIn(RelatedIn):
+    """`IN (...)` по внешнему ключу без индекса по нему в SQLite.
+
+    SQLite без статистики ANALYZE выбирает для `category_id IN (...)`
+    индекс по категории и сортирует ленту во временной таблице вместо
+    частичного индекса по дате публикации. Выражение `category_id + 0`
+    этот индекс исключает; в остальных СУБД условие — обычный `IN`.
+    """
+
+    lookup_name = 'unindexed_in'
+
+    def process_lhs(self, compiler, connection, lhs=None):
+        sql, params = super().process_lhs(compiler, connection, lhs)
+        if connection.vendor == 'sqlite':
+            sql = f'{sql} + 0'
+        return sql, params
+
+
+class PostQuerySet(models.QuerySet):
+
+    @staticmethod
+    def published_q():
+        """Условие видимости поста для всех.
+
+        Пост опубликован, его категория опубликована, а дата публикации
+        не позже текущего момента. Если справочники в памяти включены,
+        опубликованные категории берутся из них без JOIN с
+        `blog_category`.
+        """
+        # Импорт здесь: справочники сами строятся из моделей этого модуля.
+        from .lookups import categories, lookups_enabled
+
+        if not lookups_enabled():
+            return Q(
+                is_published=True,
+                category__is_published=True,
+                pub_date__lte=timezone.now()
+            )
+        return Q(
+            is_published=True,
+            category_id__unindexed_in=categories().published_ids,
+            pub_date__lte=timezone.now()
+        )
+
+    def published(self):
+        return self.filter(self.published_q())
+
+    def visible_to(self, user):
+        """Опубликованные посты и все посты самого пользователя."""
+        condition = self.published_q()
+        if user.is_authenticated:
+            condition |= Q(author=user)
+        return self.filter(condition)
+
+    def with_feed_relations(self):
+        """Подтягивает автора, категорию и местоположение одним JOIN.
+
+        При включённых справочниках в памяти JOIN только с автором, а
+        категорию и место полученным постам проставляет
+        `lookups.attach_feed_relations()`.
+        """
+        from .lookups import lookups_enabled
+
+        if lookups_enabled():
+            return self.select_related('author')
+        return self.select_related('author', 'category', 'location')
+
+    def for_feed(self):
+        return self.with_feed_relations().order_by('-pub_date', '-pk')
+
+
 class Post(PublishedCreatedModel):
     title = models.CharField('Заголовок', max_length=256)
     text = models.TextField('Текст')
@@ -62,15 +140,91 @@ class Post(PublishedCreatedModel):
         null=True, blank=False
     )
     image = models.ImageField('Фото', blank=True)
+    image_variants = models.JSONField(
+        'Уменьшенные копии фото', default=dict, blank=True, editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False
+    )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('pub_date',), condition=Q(is_published=True),
+                name='post_published_pub_date_idx'
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+            # Список в админке: в нём и неопубликованные посты, поэтому
+            # частичный индекс выше не подходит.
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.title
 
+    def set_image_variants(self, variants):
+        delete_variants(self.image.storage, self.image_variants)
+        self.image_variants = variants
+        self.save(update_fields=('image_variants', 'updated_at'))
+
+    def generate_image_variants(self):
+        """Пересоздаёт уменьшенные копии фото в текущем процессе."""
+        self.set_image_variants(
+            make_variants(self.image.storage, self.image.name)
+            if self.image else {}
+        )
+
+    def schedule_image_variants(self):
+        """Ставит создание копий фото в очередь ImageJob.
+
+        Старые копии удаляются сразу, и до обработки задания шаблоны
+        показывают оригинал.
+        """
+        self.set_image_variants({})
+        if self.image:
+            ImageJob.objects.create(post=self, image=self.image.name)
+
+    def get_image_srcset(self, format_name):
+        widths = set()
+        sources = []
+        for variant in self.image_variants.values():
+            if format_name in variant and variant['width'] not in widths:
+                widths.add(variant['width'])
+                sources.append(
+                    f'{self.image.storage.url(variant[format_name])} '
+                    f'{variant["width"]}w'
+                )
+        return ', '.join(sources)
+
+    @property
+    def image_srcset(self):
+        return self.get_image_srcset('jpeg')
+
+    @property
+    def image_webp_srcset(self):
+        return self.get_image_srcset('webp')
+
+    @property
+    def image_feed_url(self):
+        """Копия для ленты, а пока её нет — оригинал."""
+        feed = self.image_variants.get('feed')
+        if feed:
+            return self.image.storage.url(feed['jpeg'])
+        return self.image.url
+
 
 class Comment(models.Model):
     text = models.TextField('Текст')
@@ -92,8 +246,72 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx'
+            ),
+            models.Index(
+                fields=('created_at',), name='comment_created_at_idx'
+            ),
+        )
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text
+
+
+def actual_comment_count():
+    """Выражение с фактическим числом комментариев поста для update()."""
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+                'post'
+            ).annotate(total=Count('pk')).values('total')
+        ),
+        0
+    )
+
+
+class ImageJob(models.Model):
+    """Задание очереди на создание уменьшенных копий фото поста."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='image_jobs'
+    )
+    image = models.CharField('Файл фото', max_length=255)
+    status = models.CharField(
+        'Состояние', max_length=16,
+        choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    started_at = models.DateTimeField('Начато', null=True, blank=True)
+    available_at = models.DateTimeField(
+        'Не раньше', default=timezone.now,
+        help_text='Упавшее задание повторяется не раньше этого времени.'
+    )
+
+    class Meta:
+        ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('status', 'created_at'),
+                name='imagejob_status_created_idx'
+            ),
+        )
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Очередь обработки фото'
+
+    def __str__(self):
+        return self.image
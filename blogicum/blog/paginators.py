@@ -0,0 +1,187 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .caching import cap_timeout, get_version
+
+
+def encode_cursor(post):
+    """Курсор поста: пара (pub_date, id), упакованная для URL."""
+    raw = f'{post.pub_date.isoformat()}|{post.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        pub_date, pk = (
+            base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        )
+        pub_date, pk = parse_datetime(pub_date), int(pk)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise Http404('Некорректный курсор страницы.')
+    if pub_date is None:
+        raise Http404('Некорректный курсор страницы.')
+    return pub_date, pk
+
+
+class CursorPage:
+    """Страница keyset-пагинации: без номера страницы и общего COUNT."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def paginate_by_cursor(queryset, per_page, after=None, before=None):
+    """Страница постов старше курсора `after` или новее курсора `before`.
+
+    Выборка идёт по условию на (pub_date, id) вместо OFFSET, поэтому
+    стоимость запроса не зависит от глубины страницы.
+    """
+    if before:
+        pub_date, pk = decode_cursor(before)
+        posts = list(queryset.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        ).order_by('pub_date', 'pk')[:per_page + 1])
+        has_newer = len(posts) > per_page
+        posts = posts[:per_page][::-1]
+        if not posts:
+            return CursorPage(posts, next_cursor=before)
+        return CursorPage(
+            posts,
+            next_cursor=encode_cursor(posts[-1]),
+            previous_cursor=encode_cursor(posts[0]) if has_newer else None,
+        )
+    if after:
+        pub_date, pk = decode_cursor(after)
+        queryset = queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+        )
+    posts = list(queryset.order_by('-pub_date', '-pk')[:per_page + 1])
+    has_older = len(posts) > per_page
+    posts = posts[:per_page]
+    if not posts:
+        return CursorPage(posts, previous_cursor=after)
+    return CursorPage(
+        posts,
+        next_cursor=encode_cursor(posts[-1]) if has_older else None,
+        previous_cursor=encode_cursor(posts[0]) if after else None,
+    )
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, который не считает посты на каждом запросе.
+
+    Число объектов кэшируется по ключу `cache_key` на
+    `BLOG_COUNT_CACHE_TIMEOUT` секунд, но не дольше, чем до выхода
+    ближайшего отложенного поста, и сбрасывается при сохранении или
+    удалении любого поста. Если задан `BLOG_COUNT_CAP`, подсчёт
+    ограничивается этим числом строк: для больших лент точное количество
+    страниц не нужно, а до дальних страниц добираются по курсору.
+    """
+
+    def __init__(self, *args, cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return self.get_count()
+        key = f'blog:count:{get_version("posts")}:{self.cache_key}'
+        count = cache.get(key)
+        if count is None:
+            count = self.get_count()
+            cache.set(
+                key, count, cap_timeout(settings.BLOG_COUNT_CACHE_TIMEOUT)
+            )
+        return count
+
+    def get_count(self):
+        cap = settings.BLOG_COUNT_CAP
+        if cap is None:
+            return self.object_list.count()
+        return self.object_list.order_by()[:cap].count()
+
+
+class CappedCountPaginator(Paginator):
+    """Пагинатор для админки: считает строки не дальше лимита.
+
+    SQLite не хранит оценок числа строк, поэтому вместо оценки COUNT
+    выполняется по подзапросу с LIMIT и на больших таблицах не идёт
+    дальше лимита (`cap`, по умолчанию BLOG_ADMIN_COUNT_CAP). Лимит не
+    меньше размера страницы, так что для длинного списка число строк
+    всегда больше страницы. Если строк больше лимита, страницы за ним
+    открываются по номеру, а навигация ведёт на одну дальше текущей.
+    """
+
+    def __init__(self, *args, cap=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cap = max(
+            settings.BLOG_ADMIN_COUNT_CAP if cap is None else cap,
+            self.per_page
+        )
+        self.furthest_page = 1
+
+    @cached_property
+    def count(self):
+        return self.object_list.order_by()[:self.cap + 1].count()
+
+    @property
+    def is_capped(self):
+        return self.count > self.cap
+
+    @property
+    def num_pages(self):
+        pages = max(1, -(-self.count // self.per_page))
+        if self.is_capped:
+            pages = max(pages, self.furthest_page + 1)
+        return pages
+
+    def validate_number(self, number):
+        try:
+            number = super().validate_number(number)
+        except EmptyPage:
+            if not self.is_capped or int(number) < 1:
+                raise
+            number = int(number)
+        self.furthest_page = max(self.furthest_page, number)
+        return number
+
+    def page(self, number):
+        if not self.is_capped:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = self.object_list[bottom:bottom + self.per_page]
+        if not object_list:
+            raise EmptyPage('На этой странице нет строк.')
+        return self._get_page(object_list, number, self)
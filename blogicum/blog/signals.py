@@ -0,0 +1,137 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_version, forget_next_publication
+from .models import Category, Comment, Location, Post
+from .search import index_post, unindex_post
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_posts(**kwargs):
+    bump_version('posts')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_page(instance, **kwargs):
+    bump_version(f'post:{instance.pk}')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reschedule_publications(**kwargs):
+    forget_next_publication()
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(instance, update_fields=None, **kwargs):
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+def bump_version_now_and_on_commit(namespace):
+    """Увеличивает версию сразу и ещё раз после фиксации транзакции.
+
+    Иначе другой процесс может увидеть новую версию раньше новых данных
+    и надолго закэшировать в памяти старые.
+    """
+    bump_version(namespace)
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cards(**kwargs):
+    bump_version_now_and_on_commit('categories')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_cards(**kwargs):
+    bump_version_now_and_on_commit('locations')
+
+
+@receiver(pre_save, sender=User)
+def remember_username_change(instance, update_fields=None, **kwargs):
+    """Отмечает смену имени пользователя, которое видно в карточках.
+
+    Регистрация и прочие правки пользователя карточки не меняют, поэтому
+    кэш карточек и страниц из-за них не сбрасывается.
+    """
+    instance._username_changed = (
+        instance.pk is not None
+        and (update_fields is None or 'username' in update_fields)
+        and not User.objects.filter(
+            pk=instance.pk, username=instance.username
+        ).exists()
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cards(instance, **kwargs):
+    if getattr(instance, '_username_changed', False):
+        bump_version('users')
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_author_cards(**kwargs):
+    bump_version('users')
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+    bump_version('comments')
+    bump_version(f'post:{post_id}')
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_comment_page(instance, created, **kwargs):
+    if not created:
+        bump_version(f'post:{instance.post_id}')
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(instance, raw, update_fields=None, **kwargs):
+    """Запоминает пост, к которому комментарий был привязан до правки."""
+    instance._previous_post_id = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and 'post' not in update_fields:
+        return
+    instance._previous_post_id = Comment.objects.filter(
+        pk=instance.pk
+    ).values_list('post_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(instance, created, raw, **kwargs):
+    # Фикстура уже содержит comment_count постов.
+    if raw:
+        return
+    if created:
+        change_comment_count(instance.post_id, 1)
+        return
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if previous_post_id not in (None, instance.post_id):
+        change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
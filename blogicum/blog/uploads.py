@@ -0,0 +1,95 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    StopUpload, TemporaryFileUploadHandler
+)
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+# Запас на текстовые поля формы сверх размера самого файла.
+FORM_FIELDS_ALLOWANCE = 256 * 1024
+# Сколько первых байтов файла копить, чтобы Pillow прочитал заголовок.
+HEADER_BYTES = 256 * 1024
+
+
+class LimitedImageUploadHandler(TemporaryFileUploadHandler):
+    """Принимает фото потоком на диск с ранней проверкой лимитов.
+
+    Размер проверяется по Content-Length и по мере поступления данных,
+    а ширина и высота — по заголовку изображения из первых килобайтов,
+    поэтому «бомба распаковки» отклоняется до того, как загрузится целиком
+    и попадёт в Pillow. Причина отказа сохраняется в
+    `request.image_upload_error`.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.body_too_large = False
+        self.received = 0
+        self.header = b''
+        self.header_checked = False
+
+    def handle_raw_input(
+        self, input_data, meta, content_length, boundary, encoding=None
+    ):
+        self.body_too_large = (
+            content_length > settings.BLOG_IMAGE_MAX_BYTES
+            + FORM_FIELDS_ALLOWANCE
+        )
+
+    def new_file(self, *args, **kwargs):
+        if self.body_too_large:
+            self.reject_too_large()
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b''
+        self.header_checked = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.BLOG_IMAGE_MAX_BYTES:
+            self.reject_too_large()
+        if not self.header_checked:
+            self.header += raw_data
+            self.check_header()
+        return super().receive_data_chunk(raw_data, start)
+
+    def check_header(self):
+        try:
+            with Image.open(BytesIO(self.header)) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            self.reject_too_many_pixels()
+        except Exception:
+            if len(self.header) >= HEADER_BYTES:
+                self.reject(
+                    'Загрузите правильное изображение. Файл, который вы '
+                    'загрузили, поврежден или не является изображением.'
+                )
+            return
+        self.header_checked = True
+        self.header = b''
+        if (
+            max(width, height) > settings.BLOG_IMAGE_MAX_SIDE
+            or width * height > settings.BLOG_IMAGE_MAX_PIXELS
+        ):
+            self.reject_too_many_pixels()
+
+    def reject_too_large(self):
+        self.reject(
+            'Размер файла не должен превышать '
+            f'{filesizeformat(settings.BLOG_IMAGE_MAX_BYTES)}.'
+        )
+
+    def reject_too_many_pixels(self):
+        self.reject(
+            'Изображение слишком большое: не более '
+            f'{settings.BLOG_IMAGE_MAX_SIDE} точек по стороне и '
+            f'{settings.BLOG_IMAGE_MAX_PIXELS} точек всего.'
+        )
+
+    def reject(self, message):
+        if self.request is not None:
+            self.request.image_upload_error = message
+        raise StopUpload(connection_reset=True)
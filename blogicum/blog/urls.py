@@ -6,6 +6,7 @@ app_name = 'blog'
 
 urlpatterns = [
     path('', views.IndexListView.as_view(), name='index'),
+    path('search/', views.SearchView.as_view(), name='search'),
     path(
         'profile/<slug:username>/',
         views.ProfileDetailView.as_view(),
@@ -1,5 +1,8 @@
+from urllib.parse import urlencode
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.views.generic import (
     CreateView, DeleteView, ListView, UpdateView
@@ -7,43 +10,81 @@ from django.views.generic import (
 
 from .forms import CreateComment, CreatePost, EditUser
 from .mixins import (
-    PostsFilter,
+    AnonymousPageCacheMixin,
+    CachedCountMixin,
+    CursorPaginationMixin,
+    ElidedPageRangeMixin,
+    FeedRelationsMixin,
+    ImageVariantsMixin,
+    LimitedImageUploadMixin,
+    PostCardCacheMixin,
     SuccessRedirectToProfileMixin,
     SuccessRedirectToPostMixin,
     PostMixin,
     CommentMixin,
 )
-from .models import Category, Comment, Post
+from .lookups import attach_feed_relations, published_category
+from .models import Comment, Post
+from .search import search_posts
 
 User = get_user_model()
 
 NUMBER_OF_POSTS = 10
+NUMBER_OF_COMMENTS = 10
 
 
-class IndexListView(PostsFilter, ListView):
+class IndexListView(
+    AnonymousPageCacheMixin,
+    CachedCountMixin,
+    FeedRelationsMixin,
+    CursorPaginationMixin,
+    PostCardCacheMixin,
+    ElidedPageRangeMixin,
+    ListView
+):
     template_name = 'blog/index.html'
     paginate_by = NUMBER_OF_POSTS
+    page_cache_namespaces = (
+        'posts', 'comments', 'categories', 'locations', 'users'
+    )
 
     def get_queryset(self):
-        return self.get_annotate(self.get_filtred_posts(Post.objects))
+        return Post.objects.published().for_feed()
 
 
-class ProfileDetailView(PostsFilter, ListView):
+class ProfileDetailView(
+    CachedCountMixin,
+    FeedRelationsMixin,
+    CursorPaginationMixin,
+    PostCardCacheMixin,
+    ElidedPageRangeMixin,
+    ListView
+):
     template_name = 'blog/profile.html'
     paginate_by = NUMBER_OF_POSTS
 
-    def get_queryset(self):
-        posts = Post.objects.filter(author__username=self.kwargs['username'])
-        if self.request.user.username == self.kwargs['username']:
-            return self.get_annotate(posts)
-        return self.get_annotate(
-            self.get_filtred_posts(posts)
+    def get(self, request, *args, **kwargs):
+        self.profile = get_object_or_404(
+            User, username=self.kwargs['username']
         )
+        return super().get(request, *args, **kwargs)
+
+    def is_owner(self):
+        return self.request.user.pk == self.profile.pk
+
+    def get_queryset(self):
+        posts = Post.objects.filter(author_id=self.profile.pk)
+        if not self.is_owner():
+            posts = posts.published()
+        return posts.for_feed()
+
+    def get_count_cache_key(self):
+        visibility = 'all' if self.is_owner() else 'published'
+        return f'profile:{self.profile.pk}:{visibility}'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        profile = get_object_or_404(User, username=self.kwargs['username'])
-        context['profile'] = profile
+        context['profile'] = self.profile
         return context
 
 
@@ -65,7 +106,9 @@ class ProfileEditView(
 
 
 class PostCreateView(
+    LimitedImageUploadMixin,
     LoginRequiredMixin,
+    ImageVariantsMixin,
     SuccessRedirectToProfileMixin,
     CreateView
 ):
@@ -79,8 +122,10 @@ class PostCreateView(
 
 
 class PostEditView(
+    LimitedImageUploadMixin,
     LoginRequiredMixin,
     PostMixin,
+    ImageVariantsMixin,
     SuccessRedirectToPostMixin,
     UpdateView
 ):
@@ -96,26 +141,33 @@ class PostDeleteView(
     pass
 
 
-class PostDetailView(PostsFilter, ListView):
-    model = Comment
+class PostDetailView(AnonymousPageCacheMixin, ElidedPageRangeMixin, ListView):
     template_name = 'blog/detail.html'
-    paginate_by = NUMBER_OF_POSTS
+    paginate_by = NUMBER_OF_COMMENTS
     pk_url_kwarg = 'post_id'
+    page_cache_namespaces = (
+        'post:{post_id}', 'categories', 'locations', 'users'
+    )
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super().get(request, *args, **kwargs)
 
     def get_object(self):
-        post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        if self.request.user == post.author:
-            return post
-        return get_object_or_404(
-            self.get_filtred_posts(Post.objects),
+        post = get_object_or_404(
+            Post.objects.visible_to(self.request.user).with_feed_relations(),
             pk=self.kwargs['post_id']
         )
+        return attach_feed_relations([post])[0]
+
+    def get_queryset(self):
+        return self.object.comments.select_related('author')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CreateComment()
-        context['post'] = self.get_object()
-        context['comments'] = self.get_object().comments.all()
+        context['post'] = self.object
+        context['comments'] = context['object_list']
         return context
 
 
@@ -136,7 +188,6 @@ class CommentCreateView(
 
 
 class CommentEditView(
-    PostsFilter,
     LoginRequiredMixin,
     CommentMixin,
     SuccessRedirectToPostMixin,
@@ -154,23 +205,64 @@ class CommentDeleteView(
     pass
 
 
-class CategoryPostView(PostsFilter, ListView):
+class CategoryPostView(
+    AnonymousPageCacheMixin,
+    CachedCountMixin,
+    FeedRelationsMixin,
+    CursorPaginationMixin,
+    PostCardCacheMixin,
+    ElidedPageRangeMixin,
+    ListView
+):
     model = Post
     template_name = 'blog/category.html'
     paginate_by = NUMBER_OF_POSTS
+    page_cache_namespaces = (
+        'posts', 'comments', 'categories', 'locations', 'users'
+    )
+
+    def get(self, request, *args, **kwargs):
+        self.category = published_category(self.kwargs['category_slug'])
+        if self.category is None:
+            raise Http404('Категория не найдена или снята с публикации.')
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return Post.objects.published().filter(
+            category_id=self.category.pk
+        ).for_feed()
+
+    def get_count_cache_key(self):
+        return f'category:{self.category.pk}'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['category'] = self.category
+        return context
+
+
+class SearchView(
+    FeedRelationsMixin,
+    PostCardCacheMixin,
+    ElidedPageRangeMixin,
+    ListView
+):
+    template_name = 'blog/search.html'
+    paginate_by = NUMBER_OF_POSTS
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
 
     def get_queryset(self):
-        categories = self.get_filtred_posts(Post.objects).filter(
-            category__slug=self.kwargs['category_slug'],
+        return search_posts(
+            Post.objects.published().for_feed(), self.get_query()
         )
-        return categories
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category.objects.values(
-                'title', 'description'
-            ).filter(is_published=True),
-            slug=self.kwargs['category_slug']
+        context['query'] = self.get_query()
+        # Параметры, которые ссылки пагинатора добавляют перед номером.
+        context['pagination_query'] = (
+            urlencode({'q': context['query']}) + '&'
         )
         return context
@@ -137,6 +137,42 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static_dev'
 ]
 
+# Кэш. Для нескольких процессов приложения нужен общий бэкенд
+# (Memcached/Redis), иначе каждый процесс сбрасывает кэш только у себя.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Справочники категорий и местоположений в памяти процесса. None —
+# только если кэш по умолчанию общий для процессов, то есть не locmem и
+# не dummy: иначе правку в одном процессе другие заметят лишь через
+# lookups.MAX_AGE, и видимость категорий проверяется в БД.
+BLOG_IN_PROCESS_LOOKUPS = None
+
+# Число постов в лентах кэшируется на столько секунд.
+BLOG_COUNT_CACHE_TIMEOUT = 60
+
+# Если задано, посты в ленте считаются не дальше этого числа.
+BLOG_COUNT_CAP = None
+
+# Списки в админке считают строки не дальше этого числа.
+BLOG_ADMIN_COUNT_CAP = 10000
+
+# Время жизни кэша отрендеренных карточек постов, в секундах.
+BLOG_POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Время жизни кэша страниц для анонимных пользователей, в секундах.
+BLOG_PAGE_CACHE_TIMEOUT = 5 * 60
+
+# Ограничения на фото постов: размер файла и число точек.
+BLOG_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+
+BLOG_IMAGE_MAX_SIDE = 10000
+
+BLOG_IMAGE_MAX_PIXELS = 40_000_000
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -41,6 +41,14 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,7 +371,34 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
                     os.remove(file_path)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark", "бенчмарки страниц блога")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        help="Замерить страницы блога и сравнить число запросов с эталоном.",
+    )
+    group.addoption(
+        "--benchmark-update",
+        action="store_true",
+        help="Записать замеренное число запросов как новый эталон.",
+    )
+    group.addoption(
+        "--benchmark-scale",
+        type=int,
+        default=1,
+        help="Во сколько раз увеличить тестовый набор данных.",
+    )
+    group.addoption(
+        "--benchmark-repeat",
+        type=int,
+        default=20,
+        help="Сколько раз запрашивать каждую страницу для p50/p95.",
+    )
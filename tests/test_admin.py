@@ -0,0 +1,196 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from blog.paginators import CappedCountPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client: Client, url: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.parametrize(
+    "model, url",
+    (
+        ("blog.Post", "/admin/blog/post/"),
+        ("blog.Comment", "/admin/blog/comment/"),
+    ),
+)
+def test_changelist_queries_do_not_depend_on_rows(
+        mixer: Mixer, admin_client: Client, model: str, url: str
+):
+    mixer.blend(model)
+    queries_for_one_row = count_queries(admin_client, url)
+
+    mixer.cycle(10).blend(model)
+    queries_for_many_rows = count_queries(admin_client, url)
+
+    assert queries_for_one_row == queries_for_many_rows, (
+        f"Убедитесь, что число запросов к БД на странице `{url}` не зависит"
+        " от количества строк: связанные объекты должны загружаться вместе"
+        " со списком, а выпадающие списки — заменены на поиск."
+    )
+
+
+def test_changelist_search_uses_index(mixer: Mixer, admin_client: Client):
+    mixer.blend("blog.Post", title="Поход на Эльбрус")
+    mixer.blend("blog.Post", title="Рецепт пирога")
+    response = admin_client.get("/admin/blog/post/?q=эльбрус")
+    assert response.status_code == HTTPStatus.OK
+    content = response.content.decode("utf-8")
+    assert "Поход на Эльбрус" in content and "Рецепт пирога" not in content, (
+        "Убедитесь, что поиск в админке постов находит посты по заголовку."
+    )
+
+
+def run_action(client: Client, url: str, action: str, objects, **data):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post(url, {
+            "action": action,
+            "_selected_action": [obj.pk for obj in objects],
+            **data,
+        })
+    assert response.status_code == HTTPStatus.FOUND, (
+        f"Убедитесь, что действие `{action}` на странице `{url}` выполняется"
+        " без ошибок."
+    )
+    return [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith("UPDATE")
+    ]
+
+
+@pytest.mark.parametrize(
+    "model, url",
+    (
+        ("blog.Post", "/admin/blog/post/"),
+        ("blog.Category", "/admin/blog/category/"),
+        ("blog.Location", "/admin/blog/location/"),
+    ),
+)
+def test_publish_actions_use_single_update(
+        mixer: Mixer, admin_client: Client, model: str, url: str
+):
+    objects = mixer.cycle(5).blend(model, is_published=True)
+
+    updates = run_action(admin_client, url, "unpublish", objects)
+    assert len(updates) == 1, (
+        f"Убедитесь, что действие снятия с публикации на странице `{url}`"
+        " обновляет все выбранные объекты одним запросом UPDATE."
+    )
+    for obj in objects:
+        obj.refresh_from_db()
+        assert not obj.is_published
+
+    run_action(admin_client, url, "publish", objects)
+    for obj in objects:
+        obj.refresh_from_db()
+        assert obj.is_published
+
+
+def test_unpublish_action_clears_feed_cache(
+        mixer: Mixer, admin_client: Client, client: Client
+):
+    post = mixer.blend(
+        "blog.Post",
+        title="Пост для снятия с публикации",
+        is_published=True,
+        category__is_published=True,
+    )
+    assert post.title in client.get("/").content.decode("utf-8")
+
+    run_action(admin_client, "/admin/blog/post/", "unpublish", [post])
+
+    assert post.title not in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что после снятия постов с публикации через действие"
+        " админки они пропадают из закэшированной ленты."
+    )
+
+
+def test_move_to_category_action(mixer: Mixer, admin_client: Client):
+    posts = mixer.cycle(3).blend("blog.Post")
+    category = mixer.blend("blog.Category")
+
+    updates = run_action(
+        admin_client, "/admin/blog/post/", "move_to_category", posts,
+        category=category.pk,
+    )
+    assert len(updates) == 1, (
+        "Убедитесь, что действие переноса постов в категорию обновляет все"
+        " выбранные посты одним запросом UPDATE."
+    )
+    for post in posts:
+        post.refresh_from_db()
+        assert post.category == category
+
+
+@pytest.fixture
+def many_posts(mixer: Mixer):
+    def create(count):
+        author = mixer.blend("auth.User")
+        now = timezone.now()
+        return Post.objects.bulk_create(
+            Post(
+                title=f"Пост {number}", text="Текст", author=author,
+                pub_date=now - timedelta(minutes=number),
+            )
+            for number in range(count)
+        )
+    return create
+
+
+def test_changelist_pages_past_count_cap(
+        settings, admin_client: Client, many_posts
+):
+    settings.BLOG_ADMIN_COUNT_CAP = 250
+    many_posts(350)
+    response = admin_client.get("/admin/blog/post/?p=4")
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что страницы списка за пределом подсчёта строк"
+        " открываются."
+    )
+    titles = [post.title for post in response.context["cl"].result_list]
+    assert titles == [f"Пост {number}" for number in range(300, 350)]
+    assert 5 in response.context["cl"].paginator.page_range, (
+        "Убедитесь, что навигация ведёт дальше предела подсчёта строк."
+    )
+
+
+def test_count_cap_keeps_changelist_paginated(
+        settings, admin_client: Client, many_posts
+):
+    settings.BLOG_ADMIN_COUNT_CAP = 100
+    many_posts(150)
+    cl = admin_client.get("/admin/blog/post/").context["cl"]
+    assert cl.multi_page and len(cl.result_list) == cl.list_per_page, (
+        "Убедитесь, что предел подсчёта строк не отключает разбиение"
+        " списка на страницы."
+    )
+
+
+def test_capped_paginator_count_exceeds_page_size(many_posts):
+    many_posts(15)
+    paginator = CappedCountPaginator(
+        Post.objects.order_by("-pub_date"), 10, cap=3
+    )
+    assert paginator.count > paginator.per_page
+    assert [post.title for post in paginator.page(2)] == [
+        f"Пост {number}" for number in range(10, 15)
+    ]
+    with pytest.raises(EmptyPage):
+        paginator.page(3)
@@ -0,0 +1,330 @@
+"""Бенчмарк страниц блога: запросы к БД, задержка и размер ответа.
+
+Запускается только с опцией `--benchmark`:
+
+    pytest tests/test_benchmarks.py --benchmark
+
+Число запросов к БД сравнивается с эталоном из `benchmarks.json`, рост
+считается регрессией. Эталон перезаписывается опцией `--benchmark-update`.
+"""
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from datetime import timedelta
+from http import HTTPStatus
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test.client import Client
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from faker import Faker
+
+from blog.models import Category, Comment, Location, Post
+from blog.search import fts_available, index_posts
+
+pytestmark = [pytest.mark.django_db]
+
+BASELINE_PATH = Path(__file__).parent / "benchmarks.json"
+SEED = 2023
+N_USERS = 200
+N_CATEGORIES = 10
+N_LOCATIONS = 20
+N_POSTS = 2000
+N_COMMENTS = 10000
+BATCH_SIZE = 500
+
+User = get_user_model()
+
+
+class Route(NamedTuple):
+    name: str
+    url: str
+    client: str = "anonymous"
+    method: str = "get"
+    data: Optional[dict] = None
+    status: HTTPStatus = HTTPStatus.OK
+
+
+class Measurement(NamedTuple):
+    queries_cold: int
+    queries_warm: int
+    p50_ms: float
+    p95_ms: float
+    bytes: int
+
+
+def weighted_choices(rng: random.Random, population: list, k: int):
+    """Выборка со степенным распределением: первые элементы — самые частые."""
+    weights = [1 / (rank + 1) for rank in range(len(population))]
+    return rng.choices(population, weights=weights, k=k)
+
+
+def seed_dataset(scale: int):
+    rng = random.Random(SEED)
+    fake = Faker("ru_RU")
+    fake.seed_instance(SEED)
+    now = timezone.now()
+
+    User.objects.bulk_create(
+        (
+            User(username=f"bench{number}", password="!")
+            for number in range(N_USERS * scale)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    Category.objects.bulk_create(
+        Category(
+            title=fake.sentence(nb_words=2)[:256],
+            description=fake.paragraph(),
+            slug=f"bench-{number}",
+            is_published=rng.random() > 0.1,
+        )
+        for number in range(N_CATEGORIES)
+    )
+    Location.objects.bulk_create(
+        Location(name=fake.city(), is_published=rng.random() > 0.1)
+        for _ in range(N_LOCATIONS)
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith="bench")
+        .order_by("pk").values_list("pk", flat=True)
+    )
+    category_ids = list(Category.objects.values_list("pk", flat=True))
+    location_ids = list(Location.objects.values_list("pk", flat=True))
+
+    n_posts = N_POSTS * scale
+    comment_posts = Counter(
+        weighted_choices(rng, range(n_posts), N_COMMENTS * scale)
+    )
+    Post.objects.bulk_create(
+        (
+            Post(
+                title=fake.sentence(nb_words=5)[:256],
+                text=fake.paragraph(nb_sentences=8),
+                pub_date=now - timedelta(
+                    # Каждый двадцатый пост отложен на будущее.
+                    days=rng.uniform(0, 365) if number % 20 else
+                    rng.uniform(-30, 0)
+                ),
+                author_id=weighted_choices(rng, user_ids, 1)[0],
+                category_id=rng.choice(category_ids),
+                location_id=rng.choice(location_ids + [None]),
+                is_published=rng.random() > 0.05,
+                comment_count=comment_posts[number],
+            )
+            for number in range(n_posts)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    post_ids = list(Post.objects.order_by("pk").values_list("pk", flat=True))
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                text=fake.sentence(nb_words=12),
+                post_id=post_ids[number],
+                author_id=weighted_choices(rng, user_ids, 1)[0],
+            )
+            for number, count in comment_posts.items()
+            for _ in range(count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    if fts_available():
+        with connection.cursor() as cursor:
+            index_posts(
+                cursor, Post.objects.values_list("pk", "title", "text")
+            )
+
+
+def get_routes(owner, post: Post, comment: Comment) -> List[Route]:
+    username = owner.username
+    category = post.category.slug
+    word = post.title.split()[0]
+    edit_comment = f"/posts/{post.pk}/edit_comment/{comment.pk}/"
+    delete_comment = f"/posts/{post.pk}/delete_comment/{comment.pk}/"
+    return [
+        Route("index", "/"),
+        Route("index_page_5", "/?page=5"),
+        Route("index_logged_in", "/", client="owner"),
+        Route("category", f"/category/{category}/"),
+        Route("category_page_2", f"/category/{category}/?page=2"),
+        Route("profile", f"/profile/{username}/"),
+        Route("profile_owner", f"/profile/{username}/", client="owner"),
+        Route("post_detail", f"/posts/{post.pk}/"),
+        Route("post_detail_owner", f"/posts/{post.pk}/", client="owner"),
+        Route("search", f"/search/?q={word}"),
+        Route(
+            "edit_profile", f"/profile/{username}/edit/", client="owner"
+        ),
+        Route("create_post", "/posts/create/", client="owner"),
+        Route("edit_post", f"/posts/{post.pk}/edit/", client="owner"),
+        Route("delete_post", f"/posts/{post.pk}/delete/", client="owner"),
+        Route("comment_form", f"/posts/{post.pk}/comment/", client="owner"),
+        Route("edit_comment", edit_comment, client="owner"),
+        Route("delete_comment", delete_comment, client="owner"),
+        Route("about", "/pages/about/"),
+        Route("rules", "/pages/rules/"),
+        Route(
+            "add_comment",
+            f"/posts/{post.pk}/comment/",
+            client="owner",
+            method="post",
+            data={"text": "Комментарий из бенчмарка"},
+            status=HTTPStatus.FOUND,
+        ),
+    ]
+
+
+def request(client: Client, route: Route):
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        response = getattr(client, route.method)(route.url, route.data)
+        elapsed = time.perf_counter() - start
+    assert response.status_code == route.status, (
+        f"Убедитесь, что страница `{route.url}` возвращает статус"
+        f" {route.status.value}, а не {response.status_code}."
+    )
+    return len(ctx.captured_queries), elapsed, len(response.content)
+
+
+def measure(client: Client, route: Route, repeat: int) -> Measurement:
+    """Первый запрос — с пустым кэшем, остальные — с прогретым."""
+    cache.clear()
+    queries_cold, elapsed, size = request(client, route)
+    timings = [elapsed]
+    queries_warm = queries_cold
+    for _ in range(repeat - 1):
+        queries_warm, elapsed, size = request(client, route)
+        timings.append(elapsed)
+    if len(timings) > 1:
+        percentiles = statistics.quantiles(timings, n=20)
+        p50, p95 = statistics.median(timings), percentiles[-1]
+    else:
+        p50 = p95 = timings[0]
+    return Measurement(
+        queries_cold, queries_warm, p50 * 1000, p95 * 1000, size
+    )
+
+
+def format_report(results: dict) -> str:
+    lines = [
+        f"{'страница':<20} {'запросы':>12} {'p50, мс':>9}"
+        f" {'p95, мс':>9} {'байты':>9}"
+    ]
+    for name, result in results.items():
+        queries = f"{result.queries_cold}/{result.queries_warm}"
+        lines.append(
+            f"{name:<20} {queries:>12} {result.p50_ms:>9.1f}"
+            f" {result.p95_ms:>9.1f} {result.bytes:>9}"
+        )
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def benchmark_options(request):
+    if not request.config.getoption("--benchmark"):
+        pytest.skip("Бенчмарк запускается с опцией --benchmark.")
+    return {
+        "update": request.config.getoption("--benchmark-update"),
+        "scale": request.config.getoption("--benchmark-scale"),
+        "repeat": max(request.config.getoption("--benchmark-repeat"), 1),
+    }
+
+
+def test_benchmark_routes(benchmark_options, capsys):
+    seed_dataset(benchmark_options["scale"])
+    owner = User.objects.filter(username__startswith="bench").earliest("pk")
+    post = (
+        Post.objects.published()
+        .filter(author=owner)
+        .order_by("-comment_count")
+        .first()
+    )
+    assert post is not None, "Набор данных для бенчмарка создан неверно."
+    comment = Comment.objects.create(
+        post=post, author=owner, text="Комментарий автора"
+    )
+    owner_client = Client()
+    owner_client.force_login(owner)
+    clients = {"anonymous": Client(), "owner": owner_client}
+
+    results = {
+        route.name: measure(
+            clients[route.client], route, benchmark_options["repeat"]
+        )
+        for route in get_routes(owner, post, comment)
+    }
+    with capsys.disabled():
+        print("\n" + format_report(results))
+
+    measured = {
+        name: {
+            "queries_cold": result.queries_cold,
+            "queries_warm": result.queries_warm,
+        }
+        for name, result in results.items()
+    }
+    if benchmark_options["update"]:
+        BASELINE_PATH.write_text(
+            json.dumps(measured, indent=2, ensure_ascii=False) + "\n",
+            encoding="utf-8",
+        )
+        return
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    regressions = [
+        f"{name}: {key} {value} > {baseline[name][key]}"
+        for name, counts in measured.items()
+        if name in baseline
+        for key, value in counts.items()
+        if value > baseline[name][key]
+    ]
+    missing = sorted(set(measured) - set(baseline))
+    assert not missing, (
+        f"Для страниц {', '.join(missing)} нет эталона в"
+        f" `{BASELINE_PATH.name}`: запустите бенчмарк с опцией"
+        " --benchmark-update."
+    )
+    assert not regressions, (
+        "Число запросов к БД выросло по сравнению с эталоном:\n"
+        + "\n".join(regressions)
+    )
+
+
+def render_paginator(num_pages: int, repeat: int):
+    paginator = Paginator(range(num_pages * 10), 10)
+    page = paginator.page(num_pages // 2 or 1)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = render_to_string("includes/paginator.html", {
+            "page_obj": page,
+            "page_range": paginator.get_elided_page_range(page.number),
+        })
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, len(content.encode())
+
+
+def test_benchmark_paginator_render(benchmark_options, capsys):
+    results = {
+        num_pages: render_paginator(num_pages, benchmark_options["repeat"])
+        for num_pages in (10, 1000, 50000)
+    }
+    with capsys.disabled():
+        print(f"\n{'страниц':>8} {'p50, мс':>9} {'байты':>7}")
+        for num_pages, (p50, size) in results.items():
+            print(f"{num_pages:>8} {p50:>9.2f} {size:>7}")
+    _, few_pages_size = results[10]
+    _, many_pages_size = results[50000]
+    assert many_pages_size < few_pages_size * 1.5, (
+        "Убедитесь, что размер навигации по страницам не зависит"
+        " от количества страниц."
+    )
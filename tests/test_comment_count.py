@@ -0,0 +1,84 @@
+import pytest
+from django.core.management import call_command
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def stored_count(post: Post) -> int:
+    return Post.objects.values_list(
+        "comment_count", flat=True
+    ).get(pk=post.pk)
+
+
+def test_comment_count_follows_views(
+        user, user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ("Первый", "Второй"):
+        user_client.post(f"/posts/{post.id}/comment/", data={"text": text})
+    assert stored_count(post) == 2, (
+        "Убедитесь, что при добавлении комментария увеличивается"
+        " счётчик комментариев поста."
+    )
+
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    assert stored_count(post) == 1, (
+        "Убедитесь, что при удалении комментария уменьшается"
+        " счётчик комментариев поста."
+    )
+
+
+def test_comment_count_follows_cascade(
+        mixer: Mixer, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, author=another_user)
+    assert stored_count(post) == 3
+    another_user.delete()
+    assert stored_count(post) == 0, (
+        "Убедитесь, что счётчик комментариев поста уменьшается при"
+        " каскадном удалении комментариев."
+    )
+
+
+def test_recount_comments_command(mixer: Mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(4).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=100)
+    call_command("recount_comments", batch_size=1)
+    assert stored_count(post) == 4
+
+
+def test_loaddata_keeps_dumped_comment_count(
+        mixer: Mixer, tmp_path, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    fixture = tmp_path / "comments.json"
+    call_command("dumpdata", "blog.Post", "blog.Comment", output=fixture)
+    Comment.objects.all().delete()
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+    call_command("loaddata", fixture, verbosity=0)
+    assert stored_count(post) == 3, (
+        "Убедитесь, что loaddata не увеличивает счётчик комментариев,"
+        " который уже есть в фикстуре."
+    )
+
+
+def test_comment_count_follows_comment_move(
+        mixer: Mixer, post_with_published_location
+):
+    source = post_with_published_location
+    target = mixer.blend("blog.Post")
+    comment = mixer.blend("blog.Comment", post=source)
+    comment.post = target
+    comment.save()
+    assert (stored_count(source), stored_count(target)) == (0, 1), (
+        "Убедитесь, что при переносе комментария в другой пост счётчики"
+        " обоих постов меняются."
+    )
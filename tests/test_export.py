@@ -0,0 +1,69 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def export(*args, **options) -> str:
+    stdout = StringIO()
+    call_command("export_blog", *args, stdout=stdout, **options)
+    return stdout.getvalue()
+
+
+def test_export_posts_jsonl(mixer: Mixer):
+    posts = mixer.cycle(3).blend("blog.Post")
+    rows = [json.loads(line) for line in export("posts").splitlines()]
+    assert [row["id"] for row in rows] == sorted(post.pk for post in posts), (
+        "Убедитесь, что команда `export_blog` выгружает все посты"
+        " по возрастанию id, по строке JSON на пост."
+    )
+    assert rows[0]["author_username"] == posts[0].author.username
+    assert rows[0]["category_slug"] == posts[0].category.slug
+
+
+def test_export_resumes_after_id(mixer: Mixer):
+    comments = mixer.cycle(4).blend("blog.Comment")
+    after_id = comments[1].pk
+    rows = list(csv.DictReader(StringIO(export("comments", format="csv"))))
+    assert len(rows) == 4
+    rest = export("comments", format="csv", after_id=after_id)
+    assert [int(row[0]) for row in csv.reader(StringIO(rest))] == [
+        comment.pk for comment in comments[2:]
+    ], (
+        "Убедитесь, что `export_blog --after-id` выгружает только строки"
+        " с большими id и без заголовка CSV."
+    )
+
+
+def test_export_queries_do_not_depend_on_rows(
+        mixer: Mixer, django_assert_max_num_queries
+):
+    mixer.cycle(10).blend("blog.Post")
+    with django_assert_max_num_queries(1):
+        export("posts", chunk_size=3)
+
+
+def test_admin_export_is_streamed(mixer: Mixer, admin_client: Client):
+    mixer.cycle(2).blend("blog.Post")
+    response = admin_client.get("/admin/blog/post/export/?format=csv")
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming, (
+        "Убедитесь, что выгрузка в админке отдаётся потоком"
+        " (`StreamingHttpResponse`)."
+    )
+    content = b"".join(response.streaming_content).decode("utf-8")
+    assert len(list(csv.reader(StringIO(content)))) == 3
+
+
+def test_admin_export_is_admin_only(user_client: Client):
+    response = user_client.get("/admin/blog/comment/export/")
+    assert response.status_code == HTTPStatus.FOUND, (
+        "Убедитесь, что выгрузка в админке недоступна обычным пользователям."
+    )
@@ -0,0 +1,175 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test.client import Client
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import ImageJob, Post
+from blog.uploads import LimitedImageUploadHandler
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_upload(width: int, height: int, name: str = "photo.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        buffer, format="JPEG"
+    )
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+def test_variants_created_on_upload(
+        user_client: Client, published_category
+):
+    response = user_client.post(
+        "/posts/create/",
+        data={
+            "title": "С фото",
+            "text": "Текст",
+            "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M"),
+            "category": published_category.id,
+            "image": make_upload(2000, 1000),
+        },
+    )
+    assert response.status_code == 302
+    post = Post.objects.get(title="С фото")
+    assert post.image_variants == {}, (
+        "Убедитесь, что копии фото создаются не во время запроса, а"
+        " обработчиком очереди."
+    )
+    assert post.image.url in user_client.get("/").content.decode("utf-8")
+
+    call_command("process_image_jobs", once=True, workers=0)
+    post.refresh_from_db()
+    assert not ImageJob.objects.exists()
+    assert post.image_variants["feed"]["width"] == 640
+    assert post.image_variants["detail"]["width"] == 1280
+    storage = post.image.storage
+    with storage.open(post.image_variants["feed"]["webp"]) as variant:
+        assert Image.open(variant).size == (640, 320)
+
+    content = user_client.get("/").content.decode("utf-8")
+    assert post.image_webp_srcset in content, (
+        "Убедитесь, что в карточке поста указан srcset с уменьшенными"
+        " копиями фото."
+    )
+    assert 'type="image/webp"' in content
+
+
+def test_small_image_is_not_upscaled(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=make_upload(300, 200),
+    )
+    post.generate_image_variants()
+    assert post.image_variants["feed"] == post.image_variants["detail"]
+    assert post.image_variants["feed"]["width"] == 300
+    assert post.image_srcset.count("300w") == 1
+
+
+def test_backfill_command(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=make_upload(800, 600),
+    )
+    assert post.image_variants == {}
+    assert post.image_feed_url == post.image.url
+    call_command("generate_image_variants")
+    post.refresh_from_db()
+    assert set(post.image_variants) == {"feed", "detail"}
+    assert post.image_feed_url != post.image.url
+
+
+def test_worker_pool_processes_queue(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=make_upload(1000, 500),
+    )
+    post.schedule_image_variants()
+    call_command("process_image_jobs", once=True, workers=2)
+    post.refresh_from_db()
+    assert post.image_variants["feed"]["width"] == 640
+
+
+def test_failed_job_is_retried_then_marked_failed(
+        mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=SimpleUploadedFile("broken.jpg", b"not an image"),
+    )
+    post.schedule_image_variants()
+    call_command("process_image_jobs", once=True, workers=0)
+    job = ImageJob.objects.get(post=post)
+    assert (job.status, job.attempts) == (ImageJob.Status.PENDING, 1), (
+        "Убедитесь, что упавшее задание не повторяется сразу же в том же"
+        " запуске обработчика."
+    )
+    assert job.available_at > timezone.now()
+    for _ in range(2):
+        ImageJob.objects.update(available_at=timezone.now())
+        call_command("process_image_jobs", once=True, workers=0)
+    job.refresh_from_db()
+    assert job.status == ImageJob.Status.FAILED
+    assert job.attempts == 3
+    post.refresh_from_db()
+    assert post.image_feed_url == post.image.url
+
+
+def post_with_upload(client: Client, category, upload):
+    return client.post(
+        "/posts/create/",
+        data={
+            "title": "С большим фото",
+            "text": "Текст",
+            "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M"),
+            "category": category.id,
+            "image": upload,
+        },
+    )
+
+
+def test_upload_over_size_limit_rejected(
+        settings, user_client: Client, published_category
+):
+    settings.BLOG_IMAGE_MAX_BYTES = 1024
+    response = post_with_upload(
+        user_client, published_category, make_upload(400, 400)
+    )
+    assert response.status_code == 200
+    assert "Размер файла не должен превышать" in response.content.decode()
+    assert not Post.objects.filter(title="С большим фото").exists(), (
+        "Убедитесь, что пост со слишком большим фото не создаётся."
+    )
+
+
+def test_upload_with_too_many_pixels_rejected(
+        settings, user_client: Client, published_category
+):
+    settings.BLOG_IMAGE_MAX_PIXELS = 1000 * 1000
+    response = post_with_upload(
+        user_client, published_category, make_upload(1500, 1000)
+    )
+    assert "Изображение слишком большое" in response.content.decode()
+    assert not Post.objects.filter(title="С большим фото").exists()
+
+
+def test_upload_is_spooled_to_disk(user_client: Client, published_category):
+    response = post_with_upload(
+        user_client, published_category, make_upload(200, 200)
+    )
+    assert response.status_code == 302
+    assert Post.objects.filter(title="С большим фото").exists()
+    handlers = response.wsgi_request.upload_handlers
+    assert [type(handler) for handler in handlers] == [
+        LimitedImageUploadHandler
+    ], "Убедитесь, что фото поста принимается потоком во временный файл."
+
+
+def test_upload_checks_csrf():
+    client = Client(enforce_csrf_checks=True)
+    response = client.post("/posts/create/", data={})
+    assert response.status_code == 403
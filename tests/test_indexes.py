@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+
+from blog.models import Comment, Post
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite", reason="План запроса SQLite."
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "get_queryset, index_name",
+    (
+        (
+            lambda: Post.objects.published().for_feed(),
+            "post_published_pub_date_idx",
+        ),
+        (
+            lambda: Post.objects.published().filter(category_id=1).for_feed(),
+            "post_category_pub_date_idx",
+        ),
+        (
+            lambda: Post.objects.filter(author_id=1).for_feed(),
+            "post_author_pub_date_idx",
+        ),
+        (
+            lambda: Comment.objects.filter(post_id=1).select_related(
+                "author"
+            ),
+            "comment_post_created_at_idx",
+        ),
+    ),
+)
+def test_feed_query_uses_index(get_queryset, index_name, mixer):
+    # Несколько опубликованных категорий: условие становится IN (...).
+    mixer.cycle(3).blend("blog.Category", is_published=True)
+    plan = get_queryset()[:10].explain()
+    assert index_name in plan, (
+        f"Убедитесь, что запрос ленты использует индекс `{index_name}`:"
+        f"\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        "Убедитесь, что сортировка ленты выполняется по индексу, а не"
+        f" во временной таблице:\n{plan}"
+    )
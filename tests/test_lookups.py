@@ -0,0 +1,186 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.caching import bump_version
+from blog.lookups import attach_feed_relations, categories
+from blog.models import Category, Post, PostQuerySet
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def in_process_lookups(settings):
+    settings.BLOG_IN_PROCESS_LOOKUPS = True
+
+
+def get_with_queries(client: Client, url: str):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    return response, [query["sql"] for query in ctx.captured_queries]
+
+
+def test_unknown_category_404s_without_queries(
+        client: Client, published_category
+):
+    client.get(f"/category/{published_category.slug}/")
+    response, queries = get_with_queries(client, "/category/no-such-slug/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert not queries, (
+        "Убедитесь, что для несуществующей категории страница отвечает 404"
+        " по справочнику в памяти, не обращаясь к БД."
+    )
+
+
+def test_unpublished_category_404s_before_feed_query(
+        mixer: Mixer, client: Client
+):
+    category = mixer.blend("blog.Category", is_published=False)
+    mixer.blend("blog.Post", category=category, is_published=True)
+    response, queries = get_with_queries(client, f"/category/{category.slug}/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert not any("blog_post" in sql for sql in queries), (
+        "Убедитесь, что для неопубликованной категории страница отвечает"
+        " 404, не запрашивая её публикации."
+    )
+
+
+def test_category_changes_reach_lookup(published_category, client: Client):
+    url = f"/category/{published_category.slug}/"
+    assert client.get(url).status_code == HTTPStatus.OK
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что снятая с публикации категория сразу пропадает из"
+        " справочника категорий в памяти процесса."
+    )
+
+
+def test_category_feed_filters_by_category_id(
+        mixer: Mixer, published_category, client: Client
+):
+    mixer.blend("blog.Post", category=published_category, is_published=True)
+    _, queries = get_with_queries(
+        client, f"/category/{published_category.slug}/"
+    )
+    assert not any(
+        '"blog_category"."slug" =' in sql
+        for sql in queries if '"blog_post"' in sql
+    ), (
+        "Убедитесь, что посты категории отбираются по `category_id`, а не"
+        " по slug через JOIN."
+    )
+
+
+def test_feed_reads_categories_and_locations_from_lookup(
+        mixer: Mixer, user_client: Client, published_category
+):
+    location = mixer.blend("blog.Location", is_published=True)
+    mixer.cycle(3).blend(
+        "blog.Post",
+        category=published_category,
+        location=location,
+        is_published=True,
+    )
+    user_client.get("/")
+    response, queries = get_with_queries(user_client, "/")
+    content = response.content.decode("utf-8")
+    assert published_category.title in content and location.name in content
+    assert not any(
+        '"blog_category"' in sql or '"blog_location"' in sql
+        for sql in queries
+    ), (
+        "Убедитесь, что лента берёт категории и местоположения постов из"
+        " справочников в памяти, без JOIN и отдельных запросов."
+    )
+
+
+def test_lookup_follows_shared_version(published_category):
+    assert published_category.slug in categories().published_by_slug
+    # Правка в другом процессе: строки меняются без сигналов, а версия
+    # увеличивается в общем кэше.
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=False
+    )
+    assert published_category.slug in categories().published_by_slug
+    bump_version("categories")
+    assert published_category.slug not in categories().published_by_slug, (
+        "Убедитесь, что справочник категорий в памяти перечитывается при"
+        " смене версии в общем кэше."
+    )
+
+
+def test_location_rename_reaches_cards(
+        mixer: Mixer, client: Client, published_category
+):
+    location = mixer.blend("blog.Location", is_published=True, name="Тула")
+    mixer.blend(
+        "blog.Post",
+        category=published_category,
+        location=location,
+        is_published=True,
+    )
+    assert "Тула" in client.get("/").content.decode("utf-8")
+    location.name = "Калуга"
+    location.save()
+    assert "Калуга" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что после изменения местоположения карточки постов"
+        " показывают новое название."
+    )
+
+
+def test_published_q_works_without_queryset_helpers(
+        mixer: Mixer, published_category
+):
+    post = mixer.blend(
+        "blog.Post", category=published_category, is_published=True
+    )
+    mixer.blend("blog.Post", category__is_published=False, is_published=True)
+    assert list(Post.objects.filter(PostQuerySet.published_q())) == [post], (
+        "Убедитесь, что условие `PostQuerySet.published_q()` можно передать в"
+        " `filter()` любого набора постов."
+    )
+
+
+def test_posts_get_own_copies_of_lookup_objects(
+        mixer: Mixer, published_category
+):
+    mixer.cycle(2).blend(
+        "blog.Post", category=published_category, is_published=True
+    )
+    first, second = attach_feed_relations(
+        Post.objects.with_feed_relations()
+    )
+    shared = categories().by_id[published_category.pk]
+    assert first.category == second.category == shared
+    assert first.category is not second.category and all(
+        post.category is not shared for post in (first, second)
+    ), (
+        "Убедитесь, что каждый пост получает свою копию категории из"
+        " справочника, а не общий для всех запросов объект."
+    )
+
+
+def test_process_local_cache_checks_categories_in_db(
+        settings, mixer: Mixer, user_client: Client, published_category
+):
+    settings.BLOG_IN_PROCESS_LOOKUPS = None
+    mixer.blend(
+        "blog.Post", category=published_category, is_published=True,
+        title="Пост из категории"
+    )
+    user_client.get("/")
+    # Правка в другом процессе: версии, которые он увеличит в своём
+    # кэше, этому процессу не видны.
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=False
+    )
+    content = user_client.get("/").content.decode("utf-8")
+    assert "Пост из категории" not in content, (
+        "Убедитесь, что при кэше внутри процесса видимость категорий"
+        " проверяется в БД, а не по справочнику в памяти."
+    )
@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.views import IndexListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "url", ("/", "/category/{category}/", "/posts/{post}/", "/pages/about/")
+)
+def test_anonymous_pages_are_cached(
+        client: Client, post_with_published_location, url: str
+):
+    post = post_with_published_location
+    url = url.format(category=post.category.slug, post=post.id)
+    first = client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.get(url)
+    assert not ctx.captured_queries, (
+        f"Убедитесь, что страница `{url}` для анонимного пользователя"
+        " отдаётся из кэша без запросов к БД."
+    )
+    assert first.content == second.content
+
+
+def test_page_cache_key_ignores_unrelated_params(
+        client: Client, post_with_published_location
+):
+    client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/?utm_source=x&nocache=12345")
+    assert not ctx.captured_queries, (
+        "Убедитесь, что посторонние параметры запроса не входят в ключ"
+        " кэша страницы и не обходят его."
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/?page=1")
+    assert ctx.captured_queries, (
+        "Убедитесь, что номер страницы входит в ключ кэша страницы."
+    )
+
+
+def test_logged_in_pages_are_not_cached(
+        user_client: Client, post_with_published_location
+):
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get("/")
+    assert ctx.captured_queries
+
+
+def test_page_cache_invalidation(
+        mixer: Mixer, client: Client, user_client: Client,
+        post_with_published_location
+):
+    post = post_with_published_location
+    detail_url = f"/posts/{post.id}/"
+    client.get("/")
+    client.get(detail_url)
+
+    user_client.post(f"{detail_url}comment/", data={"text": "Свежий отзыв"})
+    assert "Свежий отзыв" in client.get(detail_url).content.decode()
+    assert "Комментарии (1)" in client.get("/").content.decode()
+
+    post.title = "Обновлённый пост"
+    post.save()
+    assert "Обновлённый пост" in client.get("/").content.decode()
+
+
+def test_page_cache_expires_with_scheduled_post(
+        mixer: Mixer, user, published_category
+):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    view = IndexListView()
+    view.setup(RequestFactory().get("/"))
+    assert view.get_page_cache_timeout() <= 31, (
+        "Убедитесь, что кэш ленты истекает к моменту выхода отложенного"
+        " поста."
+    )
+
+
+def test_release_scheduled_posts_invalidates_feed(
+        mixer: Mixer, client: Client, user, published_category
+):
+    from blog.caching import release_scheduled_posts
+
+    release_scheduled_posts()
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1),
+        title="Отложенный пост",
+    )
+    assert post.title not in client.get("/").content.decode()
+    assert release_scheduled_posts() == 0
+
+    release_time = timezone.now() + timedelta(hours=2)
+    assert release_scheduled_posts(now=release_time) == 1, (
+        "Убедитесь, что вышедший отложенный пост обнаруживается при"
+        " выпуске отложенных публикаций."
+    )
+    assert release_scheduled_posts(now=release_time) == 0
@@ -0,0 +1,186 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.views.generic import ListView
+from mixer.backend.django import Mixer
+
+from blog.mixins import CachedCountMixin
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    same_date = timezone.now() - timedelta(days=1)
+    pub_dates = (
+        same_date if i % 3 else same_date - timedelta(hours=i)
+        for i in range(N_PER_PAGE * 3)
+    )
+    return mixer.cycle(N_PER_PAGE * 3 - 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+def walk_by_cursor(client: Client, url: str, param: str, cursor: str):
+    seen = []
+    while cursor:
+        page_obj = client.get(f"{url}?{param}={cursor}").context["page_obj"]
+        ids = [post.id for post in page_obj]
+        if param == "after":
+            seen, cursor = seen + ids, page_obj.next_cursor
+        else:
+            seen, cursor = ids + seen, page_obj.previous_cursor
+    return seen
+
+
+@pytest.mark.parametrize(
+    "url_template", ("/", "/category/{category}/", "/profile/{author}/")
+)
+def test_cursor_pagination_walks_whole_feed(
+        user, user_client: Client, published_category, feed_posts,
+        url_template: str
+):
+    url = url_template.format(
+        category=published_category.slug, author=user.username
+    )
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda post: (post.pub_date, post.id),
+            reverse=True
+        )
+    ]
+    first_page = user_client.get(url).context["page_obj"]
+    assert [post.id for post in first_page] == expected[:N_PER_PAGE]
+    assert first_page.next_cursor, (
+        "Убедитесь, что со страницы ленты можно перейти к более старым"
+        " публикациям по курсору."
+    )
+
+    older = walk_by_cursor(user_client, url, "after", first_page.next_cursor)
+    assert expected[:N_PER_PAGE] + older == expected, (
+        "Убедитесь, что переход по ссылкам «Старее» обходит всю ленту"
+        " без пропусков и повторов."
+    )
+
+    last_page = user_client.get(
+        f"{url}?after={first_page.next_cursor}"
+    ).context["page_obj"]
+    while last_page.has_next():
+        last_page = user_client.get(
+            f"{url}?after={last_page.next_cursor}"
+        ).context["page_obj"]
+    newer = walk_by_cursor(
+        user_client, url, "before", last_page.previous_cursor
+    )
+    assert newer + [post.id for post in last_page] == expected
+
+
+def test_cursor_page_skips_count_query(user_client: Client, feed_posts):
+    cursor = user_client.get("/").context["page_obj"].next_cursor
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get(f"/?after={cursor}")
+    assert not any(
+        query["sql"].startswith("SELECT COUNT(*)")
+        for query in ctx.captured_queries
+    ), (
+        "Убедитесь, что в режиме курсорной пагинации не выполняется"
+        " подсчёт общего числа публикаций."
+    )
+
+
+def test_invalid_cursor_returns_404(user_client: Client):
+    assert user_client.get("/?after=not-a-cursor").status_code == 404
+
+
+def count_star_queries(client: Client, url: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+    return sum(
+        query["sql"].startswith("SELECT COUNT(*)")
+        for query in ctx.captured_queries
+    )
+
+
+def test_feed_count_is_cached_and_invalidated(
+        mixer: Mixer, user, user_client: Client, published_category,
+        feed_posts
+):
+    assert count_star_queries(user_client, "/") == 1
+    assert count_star_queries(user_client, "/") == 0, (
+        "Убедитесь, что число публикаций в ленте кэшируется между запросами."
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(minutes=1),
+    )
+    response = user_client.get("/")
+    assert response.context["paginator"].count == len(feed_posts) + 1, (
+        "Убедитесь, что кэш числа публикаций сбрасывается при добавлении"
+        " поста."
+    )
+
+
+def test_default_count_cache_key_depends_on_view_and_url():
+    class FeedView(CachedCountMixin, ListView):
+        pass
+
+    def key(view_class, **kwargs):
+        view = view_class()
+        view.kwargs = kwargs
+        return view.get_count_cache_key()
+
+    class OtherFeedView(FeedView):
+        pass
+
+    assert key(FeedView, slug="a") == key(FeedView, slug="a")
+    assert len({
+        key(FeedView, slug="a"), key(FeedView, slug="b"),
+        key(OtherFeedView, slug="a"),
+    }) == 3, (
+        "Убедитесь, что ключ кэша числа постов по умолчанию зависит от"
+        " представления и параметров URL."
+    )
+
+
+def test_feed_count_cap(settings, user_client: Client, feed_posts):
+    settings.BLOG_COUNT_CAP = N_PER_PAGE + 1
+    paginator = user_client.get("/").context["paginator"]
+    assert paginator.count == N_PER_PAGE + 1
+    assert paginator.num_pages == 2
+
+
+def count_page_links(content: str) -> int:
+    return content.count('class="page-item')
+
+
+def test_page_range_is_elided(
+        mixer: Mixer, user, published_category, client: Client
+):
+    mixer.cycle(N_PER_PAGE * 20).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=None,
+        is_published=True,
+    )
+    first_page = client.get("/").content.decode("utf-8")
+    middle_page = client.get("/?page=10").content.decode("utf-8")
+    assert "page=20" in first_page and "page=15" not in first_page, (
+        "Убедитесь, что навигация по страницам ленты показывает последние"
+        " страницы и окно вокруг текущей, а не ссылки на все страницы."
+    )
+    assert count_page_links(first_page) <= 20, (
+        "Убедитесь, что число ссылок в навигации по страницам не зависит"
+        " от количества страниц."
+    )
+    assert count_page_links(middle_page) <= 20
+    assert "…" in middle_page
@@ -0,0 +1,79 @@
+import pytest
+from django.test.client import Client
+
+from blog.models import Category, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def index_content(client: Client) -> str:
+    return client.get("/").content.decode("utf-8")
+
+
+def test_post_card_is_cached(
+        user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in index_content(user_client)
+    Post.objects.filter(pk=post.pk).update(title="Скрытая правка")
+    assert "Скрытая правка" not in index_content(user_client), (
+        "Убедитесь, что карточки постов в ленте берутся из кэша."
+    )
+
+
+def test_post_card_invalidated_on_post_save(
+        user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    index_content(user_client)
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in index_content(user_client), (
+        "Убедитесь, что кэш карточки сбрасывается при изменении поста."
+    )
+
+
+def test_post_card_invalidated_on_related_changes(
+        user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    index_content(user_client)
+    category = Category.objects.get(pk=post.category_id)
+    category.title = "Переименованная категория"
+    category.save()
+    assert "Переименованная категория" in index_content(user_client)
+
+    location = post.location
+    location.name = "Новое место"
+    location.save()
+    assert "Новое место" in index_content(user_client)
+
+    author = post.author
+    author.username = "renamed_author"
+    author.save()
+    assert "@renamed_author" in index_content(user_client)
+
+
+def test_signup_and_profile_edits_keep_cards_cached(
+        mixer, user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    index_content(user_client)
+    Post.objects.filter(pk=post.pk).update(title="Скрытая правка")
+    mixer.blend("auth.User")
+    author = post.author
+    author.first_name = "Имя"
+    author.save()
+    assert "Скрытая правка" not in index_content(user_client), (
+        "Убедитесь, что регистрация пользователя и правки, не меняющие"
+        " имя пользователя, не сбрасывают кэш карточек постов."
+    )
+
+
+def test_post_card_invalidated_on_new_comment(
+        user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    assert "Комментарии (0)" in index_content(user_client)
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    assert "Комментарии (1)" in index_content(user_client)
@@ -0,0 +1,44 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_unknown_profile_404s_before_feed_query(client: Client):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/profile/no-such-user/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert not any("blog_post" in q["sql"] for q in ctx.captured_queries), (
+        "Убедитесь, что для несуществующего пользователя страница профиля"
+        " отвечает 404, не запрашивая его публикации."
+    )
+
+
+def test_profile_feed_filters_by_author_id(
+        mixer: Mixer, user, client: Client
+):
+    mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category__is_published=True,
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(f"/profile/{user.username}/")
+    user_queries = [
+        q["sql"] for q in ctx.captured_queries if "auth_user" in q["sql"]
+        and "blog_post" not in q["sql"]
+    ]
+    assert len(user_queries) == 1, (
+        "Убедитесь, что автор профиля загружается из БД один раз."
+    )
+    assert not any(
+        'INNER JOIN "auth_user"' in q["sql"] and "COUNT" in q["sql"]
+        for q in ctx.captured_queries
+    ), (
+        "Убедитесь, что посты профиля отбираются по `author_id`, без JOIN"
+        " с таблицей пользователей."
+    )
@@ -0,0 +1,141 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client: Client, url: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx.captured_queries)
+
+
+def blend_feed_posts(mixer: Mixer, count: int, **kwargs):
+    return mixer.cycle(count).blend(
+        "blog.Post",
+        is_published=True,
+        category__is_published=True,
+        location__is_published=True,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    ("/", "/category/{category}/", "/profile/{author}/"),
+)
+def test_feed_queries_do_not_depend_on_page_size(
+        mixer: Mixer, user, user_client: Client, published_category,
+        url_template: str
+):
+    def url():
+        return url_template.format(
+            category=published_category.slug, author=user.username
+        )
+
+    # Прогреваем справочники категорий и местоположений.
+    count_queries(user_client, url())
+    blend_feed_posts(mixer, 1, author=user, category=published_category)
+    queries_for_one_post = count_queries(user_client, url())
+
+    blend_feed_posts(
+        mixer, N_PER_PAGE - 1, author=user, category=published_category
+    )
+    queries_for_full_page = count_queries(user_client, url())
+
+    assert queries_for_one_post == queries_for_full_page, (
+        f"Убедитесь, что число запросов к БД на странице `{url()}` не"
+        " зависит от количества публикаций на ней: автор, категория и"
+        " местоположение должны загружаться вместе с постами."
+    )
+
+
+def test_index_feed_query_count(mixer: Mixer, user_client: Client):
+    blend_feed_posts(mixer, N_PER_PAGE)
+    user_client.get("/")
+    # Сессия, пользователь и выборка постов: число постов и дата
+    # ближайшей публикации уже в кэше.
+    assert count_queries(user_client, "/") <= 3, (
+        "Убедитесь, что главная страница загружается за постоянное"
+        " число запросов к БД."
+    )
+
+
+def test_post_detail_queries_do_not_depend_on_comments(
+        mixer: Mixer, user_client: Client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    # Прогреваем справочники категорий и местоположений.
+    count_queries(user_client, url)
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    queries_for_one_comment = count_queries(user_client, url)
+
+    mixer.cycle(N_PER_PAGE - 1).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    assert count_queries(user_client, url) == queries_for_one_comment, (
+        "Убедитесь, что авторы комментариев на странице поста загружаются"
+        " одним запросом вместе с комментариями."
+    )
+
+
+def test_post_detail_paginates_comments(
+        mixer: Mixer, user_client: Client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    mixer.cycle(N_PER_PAGE * 2 + 1).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    mixer.cycle(N_PER_PAGE).blend("blog.Comment")
+
+    response = user_client.get(url)
+    page_obj = response.context["page_obj"]
+    assert len(page_obj.object_list) == N_PER_PAGE, (
+        "Убедитесь, что комментарии на странице поста разбиты на страницы."
+    )
+    assert page_obj.paginator.count == N_PER_PAGE * 2 + 1, (
+        "Убедитесь, что на странице поста считаются только комментарии"
+        " к этому посту."
+    )
+    last_page = user_client.get(f"{url}?page=3").context["page_obj"]
+    assert len(last_page.object_list) == 1
+
+
+@pytest.mark.parametrize(
+    "url_template, max_queries",
+    (
+        # Сессия, пользователь, пост и варианты категорий и местоположений
+        # в форме.
+        ("/posts/{post}/edit/", 5),
+        # Сессия, пользователь и сам объект.
+        ("/posts/{post}/delete/", 3),
+        ("/posts/{post}/edit_comment/{comment}/", 3),
+        ("/posts/{post}/delete_comment/{comment}/", 3),
+    ),
+)
+def test_edit_and_delete_pages_load_object_once(
+        user, user_client: Client, comment_to_a_post, url_template: str,
+        max_queries: int
+):
+    comment_to_a_post.author = user
+    comment_to_a_post.save()
+    url = url_template.format(
+        post=comment_to_a_post.post_id, comment=comment_to_a_post.pk
+    )
+    # Прогреваем справочники категорий и местоположений.
+    count_queries(user_client, url)
+    assert count_queries(user_client, url) <= max_queries, (
+        f"Убедитесь, что на странице `{url}` объект загружается из БД"
+        " один раз и переиспользуется для проверки авторства, формы и"
+        " шаблона."
+    )
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.search import FTS_TABLE
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blend_post(mixer: Mixer, user, published_category):
+    def blend(**kwargs):
+        params = dict(
+            author=user, category=published_category, is_published=True,
+            pub_date=timezone.now() - timedelta(hours=1),
+        )
+        params.update(kwargs)
+        return mixer.blend("blog.Post", **params)
+    return blend
+
+
+def found_ids(client: Client, query: str, page: int = 1):
+    response = client.get("/search/", {"q": query, "page": page})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_matches_word_forms(client: Client, blend_post):
+    post = blend_post(title="Про котов", text="Коты любят спать на солнце.")
+    blend_post(title="Про собак", text="Собаки любят гулять.")
+    assert found_ids(client, "котами") == [post.id], (
+        "Убедитесь, что поиск находит посты по другим формам слова."
+    )
+    assert found_ids(client, "Солнца кот") == [post.id]
+    assert found_ids(client, "лошадь") == []
+
+
+def test_search_ranks_title_higher(client: Client, blend_post):
+    in_text = blend_post(title="Заметка", text="Рецепт пирога с яблоками.")
+    in_title = blend_post(title="Пирог", text="Самый простой рецепт.")
+    assert found_ids(client, "пирог") == [in_title.id, in_text.id]
+
+
+def test_search_respects_visibility(client: Client, blend_post, mixer):
+    blend_post(title="Черновик о море", is_published=False)
+    blend_post(
+        title="Будущее о море", pub_date=timezone.now() + timedelta(days=1)
+    )
+    blend_post(
+        title="Скрытая категория о море",
+        category=mixer.blend("blog.Category", is_published=False),
+    )
+    visible = blend_post(title="Статья о море")
+    assert found_ids(client, "море") == [visible.id], (
+        "Убедитесь, что поиск показывает только опубликованные посты."
+    )
+
+
+def test_search_index_follows_changes(client: Client, blend_post):
+    post = blend_post(title="Старое название")
+    post.title = "Новое название"
+    post.save()
+    assert found_ids(client, "старое") == []
+    assert found_ids(client, "новое") == [post.id]
+    post.delete()
+    assert found_ids(client, "новое") == []
+
+
+def test_search_pagination_keeps_query(client: Client, blend_post):
+    for _ in range(N_PER_PAGE + 1):
+        blend_post(title="Путешествие")
+    response = client.get("/search/", {"q": "путешествие"})
+    query = urlencode({"q": "путешествие"})
+    assert f'href="?{query}&amp;page=2"' in response.content.decode(), (
+        "Убедитесь, что ссылки пагинатора на странице поиска сохраняют"
+        " поисковый запрос."
+    )
+    assert len(found_ids(client, "путешествие", page=2)) == 1
+
+
+def test_rebuild_search_index(client: Client, blend_post):
+    post = blend_post(title="Горы")
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    assert found_ids(client, "горы") == []
+    call_command("rebuild_search_index")
+    assert found_ids(client, "горы") == [post.id]
@@ -0,0 +1,58 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def seed_blog(**options):
+    call_command(
+        "seed_blog", users=20, categories=3, locations=5, posts=100,
+        comments=500, batch_size=30, stdout=StringIO(), **options,
+    )
+
+
+def seeded_posts():
+    return list(
+        Post.objects.order_by("pk").values_list(
+            "title", "author__username", "comment_count"
+        )
+    )
+
+
+def test_seed_blog_creates_dataset():
+    seed_blog()
+    assert Category.objects.count() == 3
+    assert Location.objects.count() == 5
+    assert Post.objects.count() == 100
+    assert Comment.objects.exists(), (
+        "Убедитесь, что команда `seed_blog` создаёт комментарии."
+    )
+    assert not Post.objects.annotate(actual=Count("comments")).exclude(
+        comment_count=F("actual")
+    ).exists(), (
+        "Убедитесь, что команда `seed_blog` заполняет `comment_count`"
+        " в соответствии с созданными комментариями."
+    )
+    assert Post.objects.filter(pub_date__gt=F("created_at")).exists(), (
+        "Убедитесь, что команда `seed_blog` создаёт и отложенные посты."
+    )
+
+
+def test_seed_blog_is_deterministic():
+    seed_blog(seed=3)
+    first_run = seeded_posts()
+    get_user_model().objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+
+    seed_blog(seed=3)
+    assert seeded_posts() == first_run, (
+        "Убедитесь, что команда `seed_blog` с тем же `--seed` создаёт те же"
+        " данные."
+    )
@@ -0,0 +1,98 @@
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+from blog.dumps import iter_json_array
+from blog.models import Category, Comment, Location, Post
+from blog.search import search_posts
+
+
+@pytest.mark.parametrize("chunk_size", (1, 7, 1024))
+def test_iter_json_array_matches_json_loads(chunk_size: int):
+    data = [
+        {"model": "blog.post", "pk": 1, "fields": {"title": "Кот [в] мешке"}},
+        {"model": "blog.post", "pk": 2, "fields": {"text": "a, b ] {c}"}},
+        [], 3, "строка",
+    ]
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    items = list(iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+    assert items == data, (
+        "Убедитесь, что потоковый разбор JSON-массива возвращает те же"
+        " элементы, что и `json.loads`, при любом размере фрагмента."
+    )
+
+
+@pytest.mark.parametrize("text", ("", "{}", '[{"a": 1}', '[{"a": '))
+def test_iter_json_array_rejects_broken_dump(text: str):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), chunk_size=2))
+
+
+@pytest.mark.django_db
+def test_stream_loaddata_restores_dump(mixer: Mixer, tmp_path):
+    posts = mixer.cycle(5).blend(
+        "blog.Post", title="Поход на Эльбрус", is_published=True
+    )
+    mixer.cycle(3).blend("blog.Comment", post=posts[0])
+    dump = tmp_path / "dump.json"
+    call_command(
+        "dumpdata", "auth.user", "blog.category", "blog.location",
+        "blog.post", "blog.comment", output=str(dump), stdout=StringIO(),
+    )
+    expected = sorted(Post.objects.values_list("pk", "title", "author_id"))
+    get_user_model().objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+
+    call_command("stream_loaddata", str(dump), batch_size=2, stdout=StringIO())
+
+    assert sorted(
+        Post.objects.values_list("pk", "title", "author_id")
+    ) == expected, (
+        "Убедитесь, что команда `stream_loaddata` восстанавливает посты"
+        " из дампа."
+    )
+    assert Comment.objects.filter(post=posts[0]).count() == 3
+    assert search_posts(Post.objects.all(), "эльбрус").count() == 5, (
+        "Убедитесь, что команда `stream_loaddata` добавляет загруженные"
+        " посты в поисковый индекс."
+    )
+
+    call_command("stream_loaddata", str(dump), stdout=StringIO())
+    assert Post.objects.count() == 5, (
+        "Убедитесь, что повторная загрузка дампа обновляет существующие"
+        " объекты, а не создаёт новые."
+    )
+
+
+@pytest.mark.django_db
+def test_stream_loaddata_recounts_comments(tmp_path):
+    # Дамп из времён до Post.comment_count, как db.json.
+    dump = tmp_path / "old_dump.json"
+    dump.write_text(json.dumps([
+        {"model": "auth.user", "pk": 1, "fields": {
+            "username": "author", "password": "!",
+            "date_joined": "2023-01-01T00:00:00Z",
+        }},
+        {"model": "blog.post", "pk": 1, "fields": {
+            "title": "Пост", "text": "Текст", "author": 1,
+            "pub_date": "2023-01-01T00:00:00Z", "is_published": True,
+            "created_at": "2023-01-01T00:00:00Z",
+        }},
+        {"model": "blog.comment", "pk": 1, "fields": {
+            "text": "Комментарий", "post": 1, "author": 1,
+            "created_at": "2023-01-02T00:00:00Z",
+        }},
+    ]), encoding="utf-8")
+
+    call_command("stream_loaddata", str(dump), stdout=StringIO())
+
+    assert Post.objects.get(pk=1).comment_count == 1, (
+        "Убедитесь, что команда `stream_loaddata` пересчитывает число"
+        " комментариев загруженных постов."
+    )